@@ -4,39 +4,242 @@ Simple API Server for AI Refinement Dashboard
 Serves dataset information and training capabilities
 """
 
+import hashlib
 import json
 import os
-from flask import Flask, jsonify, request, send_from_directory
+import concurrent.futures
+from flask import Flask, Response, jsonify, make_response, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import subprocess
 import sys
-from dataset_loader import load_any_dataset
+import threading
+import time
+import uuid
+from functools import wraps
+from dataset_loader import load_any_dataset_cached
 from database import db
 from training_executor import TrainingExecutor
 from chromadb_service import chromadb_service
 import re
-from datetime import datetime
+import requests
+import string
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # Fall back to Flask's stdlib json provider
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:  # Responses are sent uncompressed without Flask-Compress
+    Compress = None
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson's C encoder"""
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+    
+    @staticmethod
+    def _default(obj):
+        if isinstance(obj, Mapping):
+            return dict(obj)
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        if isinstance(obj, bytes):
+            return obj.decode('utf-8', 'replace')
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self._default, option=self.options).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self._default, option=self.options)
+        return self._app.response_class(body, mimetype='application/json')
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for frontend
-socketio = SocketIO(app, cors_allowed_origins="*")  # Enable SocketIO with CORS
+if Compress is not None:
+    # JSON lists repeat the same keys on every row and shrink several times under br/gzip
+    app.config['COMPRESS_MIMETYPES'] = ['application/json']
+    app.config['COMPRESS_LEVEL'] = 4
+    app.config['COMPRESS_BR_LEVEL'] = 4
+    app.config['COMPRESS_MIN_SIZE'] = 1024
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    Compress(app)
+# Enable SocketIO with CORS; MessagePack framing keeps the frequent progress packets compact
+# (the frontend decodes them with socket.io-msgpack-parser)
+socketio = SocketIO(app, cors_allowed_origins="*", serializer='msgpack',
+                    message_queue=os.environ.get('SOCKETIO_MESSAGE_QUEUE'))
 
 # Initialize training executor
 training_executor = TrainingExecutor()
 
+# Shared pool for blocking DB/ChromaDB calls made from request handlers
+_IO_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=32)
+# Bounded pool for long-running work (dataset downloads, Ollama model listing) kept off request threads
+_BG_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
 # Global variables - removed old datasets_info system
 
+def payload_version_key(payload) -> bytes:
+    """Canonical JSON bytes of a payload, for use as its conditional_json version key"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=OrjsonProvider._default, option=OrjsonProvider.options | orjson.OPT_SORT_KEYS)
+    return json.dumps(payload, sort_keys=True, default=str).encode()
+
+def conditional_json(payload, version_key):
+    """Return payload as JSON with an ETag, or an empty 304 if the client already has this version"""
+    if isinstance(version_key, str):
+        version_key = version_key.encode()
+    etag = hashlib.blake2b(version_key, digest_size=8).hexdigest()
+    # Flask-Compress tags compressed variants as "<etag>:gzip", which clients send back as-is
+    if request.if_none_match.contains(etag) or any(tag.startswith(f'{etag}:') for tag in request.if_none_match.as_set()):
+        response = app.response_class(status=304)
+    else:
+        # payload may be a callable so unchanged polls skip building the body entirely
+        response = payload() if callable(payload) else payload
+        if not isinstance(response, Response):
+            response = jsonify(response)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, must-revalidate'
+    return response
+
+class SingleFlight:
+    """Coalesce concurrent calls per key: one caller runs fn, the others wait for its result"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+        
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+        
+        try:
+            call['result'] = fn()
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call['done'].set()
+
+_single_flight = SingleFlight()
+
+def cache_for(seconds):
+    """Let clients reuse successful responses of a GET route for a few seconds"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            response = make_response(fn(*args, **kwargs))
+            # Errors must not be cached
+            if response.status_code in (200, 304):
+                cache_control = f'private, max-age={seconds}'
+                if response.get_etag()[0]:
+                    cache_control += ', must-revalidate'
+                response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
+
+def json_list_body(key, rows):
+    """Build {"success": true, key: [...], "total": n} from rows already serialized to JSON bytes"""
+    return b'{"success":true,"%s":[%s],"total":%d}' % (key.encode(), b','.join(rows), len(rows))
+
+def stream_json_list(key, rows, on_complete=None):
+    """Stream {"success": true, key: [...], "total": n} one row at a time (rows may be dicts or JSON bytes)"""
+    def generate():
+        chunks = [] if on_complete else None
+        def emit(chunk):
+            if chunks is not None:
+                chunks.append(chunk)
+            return chunk
+        
+        yield emit(f'{{"success":true,"{key}":['.encode())
+        total = 0
+        for row in rows:
+            if total:
+                yield emit(b',')
+            yield emit(row if isinstance(row, bytes) else app.json.dumps(row).encode())
+            total += 1
+        yield emit(f'],"total":{total}}}'.encode())
+        # Only reached when the whole body was sent, so a dropped client never caches a partial list
+        if on_complete:
+            on_complete(b''.join(chunks))
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+# Serialized list bodies keyed by list name, each tagged with the table version it was built from
+_list_body_cache = {}
+
+def cached_json_list(key, version_key, rows):
+    """Serve a list body cached for version_key, or stream a fresh one (from rows()) and cache it"""
+    cached = _list_body_cache.get(key)
+    if cached is not None and cached[0] == version_key:
+        return app.response_class(cached[1], mimetype='application/json')
+    
+    def store(body):
+        _list_body_cache[key] = (version_key, body)
+    return stream_json_list(key, rows(), on_complete=store)
+
+def paged_json_list(key, version_key, fetch_page):
+    """Serve one keyset page ?limit=N&before=<cursor>; next_before is the cursor for the page after it"""
+    limit = request.args.get('limit', type=int)
+    before = request.args.get('before')
+    cursor = None
+    if before:
+        # Cursor is "<created_at>|<id>" of the last row on the previous page
+        created_at, _, row_id = before.rpartition('|')
+        cursor = (created_at, int(row_id))
+    
+    def build_payload():
+        rows = fetch_page(limit, cursor)
+        next_before = None
+        if limit is not None and len(rows) == limit and rows:
+            next_before = f"{rows[-1]['created_at']}|{rows[-1]['id']}"
+        if orjson is None:
+            # LazyRows aren't dicts; only OrjsonProvider knows to serialize them as mappings
+            rows = [dict(row) for row in rows]
+        return {'success': True, key: rows, 'total': len(rows), 'next_before': next_before}
+    return conditional_json(build_payload, f"{version_key}:{limit}:{before}")
+
 @app.route('/api/datasets', methods=['GET'])
+@cache_for(2)
 def get_datasets():
-    """Get all available datasets from database"""
+    """Get all available datasets from database (one page with ?limit=&before=)"""
     try:
-        datasets = db.get_all_datasets()
+        version_key = f"datasets:{db.get_table_version('datasets')}"
+        if 'limit' in request.args or 'before' in request.args:
+            return paged_json_list('datasets', version_key, db.get_all_datasets)
+        def build_payload():
+            return cached_json_list('datasets', version_key, db.iter_datasets_json)
+        return conditional_json(build_payload, version_key)
+    except ValueError:
         return jsonify({
-            'success': True,
-            'datasets': datasets,
-            'total': len(datasets)
-        })
+            'success': False,
+            'error': 'Invalid limit or before cursor'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -45,6 +248,110 @@ def get_datasets():
 
 # Removed old get_dataset_samples function - now using database
 
+_PREVIEW_MAX_CHARS = 512
+
+def truncate_preview_sample(sample):
+    """Shorten long text fields of a sample for the stored preview"""
+    if not isinstance(sample, dict):
+        return sample
+    return {key: value[:_PREVIEW_MAX_CHARS] if isinstance(value, str) else value for key, value in sample.items()}
+
+def load_and_store_dataset(dataset_id):
+    """Load a dataset and save it to the database, returning (payload, status code)"""
+    # Load the dataset (served from the on-disk cache on retries)
+    result = load_any_dataset_cached(dataset_id, max_samples=1000)
+    
+    if result.get('success'):
+        # Take the samples off the result so only all_samples keeps them alive
+        samples = result.pop('samples')
+        # converted_samples duplicates all_samples, keep only the analysis summary
+        format_analysis = {
+            key: value for key, value in (result.pop('metadata', {}).get('format_analysis') or {}).items()
+            if key != 'converted_samples'
+        }
+        
+        # Prepare dataset data for database
+        dataset_data = {
+            'name': result['name'],
+            'description': result['description'],
+            'dataset_id': result['dataset_id'],
+            'type': 'Text',
+            'sample_count': result['total_samples'],
+            'loaded_samples': result['loaded_samples'],
+            'size': result['size'],
+            'format': result['format'],
+            'license': 'See Hugging Face',
+            'tags': ['hugging-face', 'imported'],
+            'source': f'Hugging Face - {dataset_id}',
+            'metadata': {
+                'loaded_at': result['loaded_at'],
+                'split_used': result.get('split_used', 'train'),
+                'samples_preview': [truncate_preview_sample(sample) for sample in samples[:10]],  # Store first 10 samples as preview
+                'all_samples': samples,  # Store all samples for training
+                'format_analysis': format_analysis  # Include format analysis!
+            }
+        }
+        
+        # Save to database unless it already exists, getting the saved row back in the same statement
+        inserted, saved_dataset = db.insert_dataset_if_absent(dataset_data)
+        if not inserted:
+            return {
+                'success': False,
+                'error': f'Dataset {dataset_id} already exists'
+            }, 400
+        
+        return {
+            'success': True,
+            'message': f'Successfully loaded {result["name"]} with {result["loaded_samples"]} samples',
+            'dataset': saved_dataset
+        }, 200
+    else:
+        return {
+            'success': False,
+            'error': result.get('error', 'Unknown error loading dataset')
+        }, 500
+
+# Background dataset loads, polled through /api/tasks/<task_id>
+_TASK_RETENTION = 3600  # seconds a finished task stays pollable
+_tasks = {}
+_dataset_tasks = {}
+_tasks_lock = threading.Lock()
+
+def run_dataset_task(dataset_id):
+    """Background wrapper for load_and_store_dataset that never raises"""
+    try:
+        return load_and_store_dataset(dataset_id)
+    except Exception as e:
+        print(f"Error loading dataset {dataset_id}: {e}")
+        return {
+            'success': False,
+            'error': f'Error loading dataset: {str(e)}'
+        }, 500
+
+def prune_tasks():
+    """Forget finished tasks older than the retention window (call with _tasks_lock held)"""
+    cutoff = time.monotonic() - _TASK_RETENTION
+    for task_id in [tid for tid, task in _tasks.items() if task['future'].done() and task['created'] < cutoff]:
+        del _tasks[task_id]
+
+def submit_dataset_task(dataset_id):
+    """Start loading a dataset in the background, reusing the task if it is already in flight"""
+    with _tasks_lock:
+        prune_tasks()
+        task_id = _dataset_tasks.get(dataset_id)
+        if task_id in _tasks and not _tasks[task_id]['future'].done():
+            return task_id
+        
+        task_id = uuid.uuid4().hex
+        _tasks[task_id] = {
+            'type': 'load-dataset',
+            'dataset_id': dataset_id,
+            'created': time.monotonic(),
+            'future': _BG_POOL.submit(run_dataset_task, dataset_id)
+        }
+        _dataset_tasks[dataset_id] = task_id
+        return task_id
+
 @app.route('/api/load-dataset', methods=['POST'])
 def load_new_dataset():
     """Load a new dataset from Hugging Face"""
@@ -75,59 +382,17 @@ def load_new_dataset():
         print(f"Dataset ID type: {type(dataset_id)}")
         print(f"Dataset ID value: {repr(dataset_id)}")
         
-        # Import and use the new dynamic loader
-        from dataset_loader import load_any_dataset
-        
-        # Load the dataset
-        result = load_any_dataset(dataset_id, max_samples=1000)
-        
-        if result.get('success'):
-            # Check if dataset already exists
-            existing_dataset = db.get_dataset_by_id(dataset_id)
-            if existing_dataset:
-                return jsonify({
-                    'success': False,
-                    'error': f'Dataset {dataset_id} already exists'
-                }), 400
-            
-            # Prepare dataset data for database
-            dataset_data = {
-                'name': result['name'],
-                'description': result['description'],
-                'dataset_id': result['dataset_id'],
-                'type': 'Text',
-                'sample_count': result['total_samples'],
-                'loaded_samples': result['loaded_samples'],
-                'size': result['size'],
-                'format': result['format'],
-                'license': 'See Hugging Face',
-                'tags': ['hugging-face', 'imported'],
-                'source': f'Hugging Face - {dataset_id}',
-                'metadata': {
-                    'loaded_at': result['loaded_at'],
-                    'split_used': result.get('split_used', 'train'),
-                    'samples_preview': result['samples'][:10],  # Store first 10 samples as preview
-                    'all_samples': result['samples'],  # Store all samples for training
-                    'format_analysis': result['metadata'].get('format_analysis')  # Include format analysis!
-                }
-            }
-            
-            # Save to database
-            db_dataset_id = db.add_dataset(dataset_data)
-            
-            # Get the saved dataset for response
-            saved_dataset = db.get_dataset_by_id(dataset_id)
-            
+        # Large downloads can run in the background: {"async": true} returns a task handle to poll
+        if data.get('async'):
+            task_id = submit_dataset_task(dataset_id)
             return jsonify({
                 'success': True,
-                'message': f'Successfully loaded {result["name"]} with {result["loaded_samples"]} samples',
-                'dataset': saved_dataset
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result.get('error', 'Unknown error loading dataset')
-            }), 500
+                'task_id': task_id,
+                'status_url': f'/api/tasks/{task_id}'
+            }), 202
+        
+        payload, status_code = load_and_store_dataset(dataset_id)
+        return jsonify(payload), status_code
             
     except Exception as e:
         print(f"Error loading dataset {dataset_id}: {e}")
@@ -138,6 +403,34 @@ def load_new_dataset():
             'error': f'Error loading dataset: {str(e)}'
         }), 500
 
+@app.route('/api/tasks/<task_id>', methods=['GET'])
+def get_task_status(task_id):
+    """Get the status and, once finished, the result of a background task"""
+    with _tasks_lock:
+        task = _tasks.get(task_id)
+    
+    if task is None:
+        return jsonify({
+            'success': False,
+            'error': 'Task not found'
+        }), 404
+    
+    response = {
+        'success': True,
+        'task_id': task_id,
+        'type': task['type'],
+        'dataset_id': task['dataset_id'],
+        'done': task['future'].done()
+    }
+    if response['done']:
+        result, status_code = task['future'].result()
+        response['status'] = 'completed' if result.get('success') else 'failed'
+        response['result'] = result
+        response['status_code'] = status_code
+    else:
+        response['status'] = 'running'
+    return jsonify(response)
+
 @app.route('/api/datasets/<dataset_id>', methods=['DELETE'])
 def delete_dataset(dataset_id):
     """Delete a dataset"""
@@ -181,6 +474,66 @@ def toggle_favorite(dataset_id):
         }), 500
 
 
+# Precompiled patterns for parsing 'ollama show' output
+_RE_CAPABILITIES_SECTION = re.compile(r'Capabilities\s*\n((?:\s+\w+\s*\n?)+)')
+_RE_CAPABILITY = re.compile(r'\s+(\w+)')
+_RE_ARCHITECTURE = re.compile(r'architecture\s+(\w+)')
+_RE_PARAMETERS = re.compile(r'parameters\s+([\d.]+[BMK]?)')
+_RE_CONTEXT_LENGTH = re.compile(r'context length\s+(\d+)')
+_RE_QUANTIZATION = re.compile(r'quantization\s+(\w+)')
+_RE_TEMPERATURE = re.compile(r'temperature\s+([\d.]+)')
+_RE_TOP_P = re.compile(r'top_p\s+([\d.]+)')
+_RE_SYSTEM = re.compile(r'System\s*\n(.+?)(?:\n\s*\n|\n\s*License|\n\s*Parameters)', re.DOTALL)
+_RE_LICENSE = re.compile(r'License\s*\n(.+?)(?:\n\s*\n|\Z)', re.DOTALL)
+
+# Name keywords -> capabilities, used when 'ollama show' is unavailable
+_CAP_REGEXES = (
+    (re.compile(r'code|coder|codellama'), ('Coding', 'Code Generation', 'Debugging')),
+    (re.compile(r'llama|qwen|mistral'), ('Reasoning', 'Planning')),
+    (re.compile(r'llava|vision'), ('Visual Analysis',)),
+    (re.compile(r'chat|instruct'), ('Conversation', 'Instructions')),
+)
+
+# System prompt keywords -> capabilities
+_PROMPT_CAPABILITY_KEYWORDS = (
+    ('debugging', 'Debugging'),
+    ('code analysis', 'Code Analysis'),
+    ('programming', 'Programming'),
+    ('mathematics', 'Mathematics'),
+    ('reasoning', 'Reasoning'),
+    ('planning', 'Planning'),
+    ('conversation', 'Conversation'),
+    ('instruction', 'Instruction Following'),
+    ('creative', 'Creative Writing'),
+    ('analysis', 'Analysis'),
+    ('problem solving', 'Problem Solving'),
+    ('devops', 'DevOps'),
+    ('kubernetes', 'Kubernetes'),
+    ('docker', 'Docker'),
+    ('ci/cd', 'CI/CD')
+)
+
+# Architecture -> capabilities
+_ARCH_CAPABILITIES = {
+    'llama': ('Reasoning', 'Planning'),
+    'mistral': ('Reasoning', 'Efficiency'),
+    'qwen': ('Multilingual', 'Reasoning'),
+    'phi': ('Efficiency', 'Reasoning'),
+    'gemma': ('Efficiency', 'Reasoning')
+}
+
+class _ModelNameTable(dict):
+    """str.translate table: ASCII letters/digits lowercased, whitespace and '-' to '-', everything else dropped"""
+    def __missing__(self, code):
+        value = '-' if chr(code).isspace() else None
+        self[code] = value
+        return value
+
+# Model name sanitization tables
+_MODEL_NAME_TABLE = _ModelNameTable({ord(ch): ch.lower() for ch in string.ascii_letters + string.digits})
+_MODEL_NAME_TABLE[ord('-')] = '-'
+_RE_VERSION_INVALID = re.compile(r'[^a-zA-Z0-9\-_.]')
+
 def get_model_details_from_ollama(model_name):
     """Get detailed model information from ollama show command"""
     try:
@@ -202,67 +555,62 @@ def get_model_details_from_ollama(model_name):
             'system_prompt': '',
             'license': 'Unknown'
         }
+        capabilities = set()
         
         # Parse capabilities section
-        capabilities_match = re.search(r'Capabilities\s*\n((?:\s+\w+\s*\n?)+)', output)
+        capabilities_match = _RE_CAPABILITIES_SECTION.search(output)
         if capabilities_match:
-            capabilities_text = capabilities_match.group(1)
-            capabilities = re.findall(r'\s+(\w+)', capabilities_text)
-            details['capabilities'] = capabilities
+            capabilities.update(_RE_CAPABILITY.findall(capabilities_match.group(1)))
         
         # Parse architecture
-        arch_match = re.search(r'architecture\s+(\w+)', output)
+        arch_match = _RE_ARCHITECTURE.search(output)
         if arch_match:
             details['architecture'] = arch_match.group(1)
         
         # Parse parameters
-        param_match = re.search(r'parameters\s+([\d.]+[BMK]?)', output)
+        param_match = _RE_PARAMETERS.search(output)
         if param_match:
             details['parameters'] = param_match.group(1)
         
         # Parse context length
-        ctx_match = re.search(r'context length\s+(\d+)', output)
+        ctx_match = _RE_CONTEXT_LENGTH.search(output)
         if ctx_match:
             details['context_length'] = int(ctx_match.group(1))
         
         # Parse quantization
-        quant_match = re.search(r'quantization\s+(\w+)', output)
+        quant_match = _RE_QUANTIZATION.search(output)
         if quant_match:
             details['quantization'] = quant_match.group(1)
         
         # Parse temperature
-        temp_match = re.search(r'temperature\s+([\d.]+)', output)
+        temp_match = _RE_TEMPERATURE.search(output)
         if temp_match:
             details['temperature'] = float(temp_match.group(1))
         
         # Parse top_p
-        top_p_match = re.search(r'top_p\s+([\d.]+)', output)
+        top_p_match = _RE_TOP_P.search(output)
         if top_p_match:
             details['top_p'] = float(top_p_match.group(1))
         
         # Parse system prompt
-        system_match = re.search(r'System\s*\n(.+?)(?:\n\s*\n|\n\s*License|\n\s*Parameters)', output, re.DOTALL)
+        system_match = _RE_SYSTEM.search(output)
         if system_match:
             details['system_prompt'] = system_match.group(1).strip()
         
         # Parse license
-        license_match = re.search(r'License\s*\n(.+?)(?:\n\s*\n|\Z)', output, re.DOTALL)
+        license_match = _RE_LICENSE.search(output)
         if license_match:
             details['license'] = license_match.group(1).strip().split('\n')[0]
         
         # Add specialized capabilities from system prompt
         if details['system_prompt']:
-            specialized_caps = extract_capabilities_from_prompt(details['system_prompt'])
-            details['capabilities'].extend(specialized_caps)
+            capabilities.update(extract_capabilities_from_prompt(details['system_prompt']))
         
         # Add architecture-based capabilities
-        arch_caps = get_architecture_capabilities(details['architecture'])
-        details['capabilities'].extend(arch_caps)
+        capabilities.update(get_architecture_capabilities(details['architecture']))
         
-        # Remove duplicates and ensure we have at least one capability
-        details['capabilities'] = list(set(details['capabilities']))
-        if not details['capabilities']:
-            details['capabilities'] = ['General Purpose']
+        # Ensure we have at least one capability
+        details['capabilities'] = list(capabilities) or ['General Purpose']
         
         return details
         
@@ -272,23 +620,16 @@ def get_model_details_from_ollama(model_name):
 
 def get_fallback_model_details(model_name):
     """Fallback model details when ollama show fails"""
-    capabilities = []
+    capabilities = set()
+    name_lower = model_name.lower()
     
     # Basic pattern matching as fallback
-    if any(keyword in model_name.lower() for keyword in ['code', 'coder', 'codellama']):
-        capabilities.extend(['Coding', 'Code Generation', 'Debugging'])
-    if any(keyword in model_name.lower() for keyword in ['llama', 'qwen', 'mistral']):
-        capabilities.extend(['Reasoning', 'Planning'])
-    if any(keyword in model_name.lower() for keyword in ['llava', 'vision']):
-        capabilities.extend(['Visual Analysis'])
-    if any(keyword in model_name.lower() for keyword in ['chat', 'instruct']):
-        capabilities.extend(['Conversation', 'Instructions'])
-    
-    if not capabilities:
-        capabilities = ['General Purpose']
+    for pattern, caps in _CAP_REGEXES:
+        if pattern.search(name_lower):
+            capabilities.update(caps)
     
     return {
-        'capabilities': capabilities,
+        'capabilities': list(capabilities) or ['General Purpose'],
         'architecture': 'Unknown',
         'parameters': 'Unknown',
         'context_length': 'Unknown',
@@ -301,62 +642,22 @@ def get_fallback_model_details(model_name):
 
 def extract_capabilities_from_prompt(system_prompt):
     """Extract specialized capabilities from system prompt"""
-    capabilities = []
     prompt_lower = system_prompt.lower()
-    
-    # Common capability keywords
-    capability_keywords = {
-        'debugging': 'Debugging',
-        'code analysis': 'Code Analysis',
-        'programming': 'Programming',
-        'mathematics': 'Mathematics',
-        'reasoning': 'Reasoning',
-        'planning': 'Planning',
-        'conversation': 'Conversation',
-        'instruction': 'Instruction Following',
-        'creative': 'Creative Writing',
-        'analysis': 'Analysis',
-        'problem solving': 'Problem Solving',
-        'devops': 'DevOps',
-        'kubernetes': 'Kubernetes',
-        'docker': 'Docker',
-        'ci/cd': 'CI/CD'
-    }
-    
-    for keyword, capability in capability_keywords.items():
-        if keyword in prompt_lower:
-            capabilities.append(capability)
-    
-    return capabilities
+    return [capability for keyword, capability in _PROMPT_CAPABILITY_KEYWORDS if keyword in prompt_lower]
 
 def get_architecture_capabilities(architecture):
     """Get capabilities based on model architecture"""
-    arch_capabilities = {
-        'llama': ['Reasoning', 'Planning'],
-        'mistral': ['Reasoning', 'Efficiency'],
-        'qwen': ['Multilingual', 'Reasoning'],
-        'phi': ['Efficiency', 'Reasoning'],
-        'gemma': ['Efficiency', 'Reasoning']
-    }
-    
-    return arch_capabilities.get(architecture.lower(), [])
+    return list(_ARCH_CAPABILITIES.get(architecture.lower(), ()))
 
 def sanitize_model_name(job_name, version=''):
     """Convert job name to valid Ollama model name with version"""
-    # Remove special characters and convert to lowercase
-    sanitized = re.sub(r'[^a-zA-Z0-9\s-]', '', job_name)
-    # Replace spaces with hyphens
-    sanitized = re.sub(r'\s+', '-', sanitized)
-    # Convert to lowercase
-    sanitized = sanitized.lower()
-    # Remove multiple hyphens
-    sanitized = re.sub(r'-+', '-', sanitized)
-    # Remove leading/trailing hyphens
-    sanitized = sanitized.strip('-')
+    # One translate pass drops special characters, lowercases and turns whitespace into hyphens;
+    # splitting on hyphens then collapses runs and trims the ends
+    sanitized = '-'.join(filter(None, job_name.translate(_MODEL_NAME_TABLE).split('-'))) or 'model'
     
     # Add version if provided, otherwise add :latest
     if version and version.strip():
-        version_clean = re.sub(r'[^a-zA-Z0-9\-_.]', '-', version.strip())
+        version_clean = _RE_VERSION_INVALID.sub('-', version.strip())
         version_clean = version_clean.lower()
         sanitized += f':{version_clean}'
     else:
@@ -366,14 +667,19 @@ def sanitize_model_name(job_name, version=''):
 
 @app.route('/api/training-jobs', methods=['GET'])
 def get_training_jobs():
-    """Get all training jobs"""
+    """Get all training jobs (one page with ?limit=&before=)"""
     try:
-        jobs = db.get_all_training_jobs()
+        version_key = f"training_jobs:{db.get_table_version('training_jobs')}"
+        if 'limit' in request.args or 'before' in request.args:
+            return paged_json_list('jobs', version_key, db.get_training_jobs)
+        def build_payload():
+            return cached_json_list('jobs', version_key, db.iter_training_jobs_json)
+        return conditional_json(build_payload, version_key)
+    except ValueError:
         return jsonify({
-            'success': True,
-            'jobs': jobs,
-            'total': len(jobs)
-        })
+            'success': False,
+            'error': 'Invalid limit or before cursor'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -416,20 +722,19 @@ def create_training_job():
             'context_length': data.get('context_length', 4096),
             'status': 'PENDING',
             'progress': 0.0,
-            'config': json.dumps(data),
-            'model_name': model_name,  # The actual model name that will be created
-            'created_at': datetime.now().isoformat()
+            'config': request.get_data(as_text=True),  # Already-validated request JSON, stored without re-encoding
+            'model_name': model_name  # The actual model name that will be created
         }
         
-        # Save to database
-        job_id = db.add_training_job(job_data)
+        # Save to database; RETURNING * hands back the stored row with its ID and defaults
+        job = db.add_training_job(job_data, return_row=True)
         
         return jsonify({
             'success': True,
             'message': 'Training job created successfully',
-            'job_id': job_id,
+            'job_id': job['id'],
             'model_name': model_name,
-            'job': job_data
+            'job': job
         })
         
     except Exception as e:
@@ -447,6 +752,10 @@ def update_training_job(job_id):
         # Update job in database
         success = db.update_training_job(job_id, data)
         
+        # A completed job means a new Ollama model
+        if success and data.get('status') == 'COMPLETED':
+            invalidate_models_cache()
+        
         if success:
             return jsonify({
                 'success': True,
@@ -458,6 +767,12 @@ def update_training_job(job_id):
                 'error': 'Job not found'
             }), 404
             
+    except ValueError as e:
+        # Unknown column in the request body
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -510,6 +825,7 @@ def delete_training_job(job_id):
                         result = subprocess.run(['ollama', 'rm', ollama_model_name], 
                                               capture_output=True, text=True, timeout=10)
                         if result.returncode == 0:
+                            invalidate_models_cache()
                             cleanup_results.append(f"Ollama model '{ollama_model_name}': removed")
                         else:
                             cleanup_results.append(f"Ollama model '{ollama_model_name}': not found or error")
@@ -554,6 +870,57 @@ def delete_training_job(job_id):
             'error': str(e)
         }), 500
 
+_rag_executor = None
+
+def get_rag_executor():
+    """Get the shared RAG training executor, importing it on first use"""
+    global _rag_executor
+    if _rag_executor is None:
+        from rag_training_executor import TrainingExecutor as RAGTrainingExecutor
+        _rag_executor = RAGTrainingExecutor()
+    return _rag_executor
+
+def executor_for_job(job_id):
+    """The executor whose thread is running the job, defaulting to the LoRA training executor"""
+    if _rag_executor is not None and _rag_executor.is_running(job_id):
+        return _rag_executor
+    return training_executor
+
+def _start_training_impl(job_id, training_type=None):
+    """Start training for a job unless it is already running (shared by both start routes)"""
+    # Get job data from database
+    job = db.get_training_job_by_id(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    # Start real training based on training type
+    training_type = training_type or job.get('training_type') or 'lora'
+    executor = get_rag_executor() if training_type.lower() == 'rag' else training_executor
+    
+    if executor.is_running(job_id):
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'message': f'Training already running for job: {job["name"]}'
+        })
+    
+    success = executor.start_training(job_id, job)
+    
+    if success:
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'message': f'Real training started for job: {job["name"]}'
+        })
+    else:
+        return jsonify({
+            'success': False,
+            'error': 'Failed to start training'
+        }), 500
+
 @app.route('/api/start-training', methods=['POST'])
 def start_training():
     """Start real training for a job"""
@@ -567,37 +934,7 @@ def start_training():
                 'error': 'Job ID is required'
             }), 400
         
-        # Get job data from database
-        job = db.get_training_job_by_id(job_id)
-        if not job:
-            return jsonify({
-                'success': False,
-                'error': 'Job not found'
-            }), 404
-        
-        # Start real training based on training type
-        training_type = data.get('training_type', job.get('training_type', 'lora'))
-        
-        if training_type.lower() == 'rag':
-            # Import and use RAG training executor
-            from rag_training_executor import TrainingExecutor as RAGTrainingExecutor
-            rag_executor = RAGTrainingExecutor()
-            success = rag_executor.start_training(job_id, job)
-        else:
-            # Use default LoRA training executor
-            success = training_executor.start_training(job_id, job)
-        
-        if success:
-            return jsonify({
-                'success': True,
-                'job_id': job_id,
-                'message': f'Real training started for job: {job["name"]}'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to start training'
-            }), 500
+        return _start_training_impl(int(job_id), data.get('training_type'))
         
     except Exception as e:
         return jsonify({
@@ -609,27 +946,7 @@ def start_training():
 def start_specific_training(job_id):
     """Start training for a specific job"""
     try:
-        # Get job data from database
-        job = db.get_training_job_by_id(job_id)
-        if not job:
-            return jsonify({
-                'success': False,
-                'error': 'Job not found'
-            }), 404
-        
-        # Start real training
-        success = training_executor.start_training(job_id, job)
-        
-        if success:
-            return jsonify({
-                'success': True,
-                'message': f'Training started for job: {job["name"]}'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to start training'
-            }), 500
+        return _start_training_impl(job_id)
         
     except Exception as e:
         return jsonify({
@@ -641,7 +958,7 @@ def start_specific_training(job_id):
 def stop_specific_training(job_id):
     """Stop training for a specific job"""
     try:
-        success = training_executor.stop_training(job_id)
+        success = executor_for_job(job_id).stop_training(job_id)
         
         if success:
             return jsonify({
@@ -660,11 +977,50 @@ def stop_specific_training(job_id):
             'error': str(e)
         }), 500
 
+_MAX_STATUS_BATCH = 200
+
+@app.route('/api/training-jobs/statuses', methods=['GET'])
+def get_training_statuses():
+    """Get training status for several jobs in one request (?ids=1,2,3)"""
+    try:
+        raw_ids = [i for i in request.args.get('ids', '').split(',') if i.strip()]
+        
+        try:
+            job_ids = list(dict.fromkeys(int(i) for i in raw_ids))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'ids must be a comma-separated list of integers'
+            }), 400
+        
+        if len(job_ids) > _MAX_STATUS_BATCH:
+            return jsonify({
+                'success': False,
+                'error': f'At most {_MAX_STATUS_BATCH} job ids per request'
+            }), 400
+        
+        statuses = training_executor.get_training_statuses(job_ids)
+        if _rag_executor is not None:
+            # RAG jobs run on their own executor, so overlay its live entries
+            for job_id in job_ids:
+                if _rag_executor.is_running(job_id):
+                    statuses[job_id] = _rag_executor.get_training_status(job_id)
+        return jsonify({
+            'success': True,
+            'statuses': statuses
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/training-jobs/<int:job_id>/status', methods=['GET'])
 def get_training_status(job_id):
     """Get training status for a specific job"""
     try:
-        status = training_executor.get_training_status(job_id)
+        status = executor_for_job(job_id).get_training_status(job_id)
         
         if status:
             return jsonify({
@@ -687,12 +1043,14 @@ def get_training_status(job_id):
 def get_evaluations():
     """Get all evaluations"""
     try:
-        evaluations = db.get_evaluations()
-        return jsonify({
-            'success': True,
-            'evaluations': evaluations,
-            'total': len(evaluations)
-        })
+        version_key = f"evaluations:{db.get_table_version('evaluations')}"
+        
+        def build_body():
+            return json_list_body('evaluations', db.get_evaluations_json())
+        # Concurrent polls of the same version share one query; each request gets its own Response
+        return conditional_json(
+            lambda: app.response_class(_single_flight.do(version_key, build_body), mimetype='application/json'),
+            version_key)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -834,68 +1192,131 @@ def delete_evaluation(eval_id):
             'error': str(e)
         }), 500
 
+# Cached /api/models payload ('ollama list' + 'ollama show' per model is slow)
+_MODELS_TTL = 10  # seconds
+OLLAMA_API_URL = 'http://127.0.0.1:11434'
+_ollama_session = requests.Session()  # Keep-alive connection reuse across requests
+_models_cache = {'ts': 0.0, 'payload': None}
+_models_lock = threading.Lock()
+
+def invalidate_models_cache():
+    """Drop the cached Ollama model list so the next request rebuilds it"""
+    with _models_lock:
+        _models_cache['ts'] = 0.0
+        _models_cache['payload'] = None
+
+_MODELS_WAIT = 2  # seconds a request waits for a rebuild before serving the stale list
+_models_refresh = None
+_models_refresh_lock = threading.Lock()
+
+def get_cached_models_payload(max_age):
+    """Get the cached model list if it is younger than max_age seconds, else None"""
+    payload = _models_cache['payload']
+    if payload is not None and time.monotonic() - _models_cache['ts'] < max_age:
+        return payload
+    return None
+
+def refresh_models_in_background():
+    """Start a background rebuild of the model list, or join the one already running"""
+    global _models_refresh
+    with _models_refresh_lock:
+        if _models_refresh is None or _models_refresh.done():
+            _models_refresh = _BG_POOL.submit(get_models_payload)
+        return _models_refresh
+
+def get_models_payload():
+    """Get the /api/models payload, rebuilding it at most once per TTL"""
+    # Holding the lock while rebuilding keeps concurrent requests from issuing duplicate Ollama queries
+    with _models_lock:
+        payload = _models_cache['payload']
+        if payload is not None and time.monotonic() - _models_cache['ts'] < _MODELS_TTL:
+            return payload
+        
+        payload = fetch_ollama_models()
+        _models_cache['payload'] = payload
+        _models_cache['ts'] = time.monotonic()
+        return payload
+
+def format_model_size(size_bytes):
+    """Format a byte count the way 'ollama list' displays it"""
+    if not isinstance(size_bytes, (int, float)):
+        return 'Unknown'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size_bytes < 1000:
+            return f"{size_bytes:.0f} {unit}" if unit == 'B' else f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1000
+    return f"{size_bytes:.1f} TB"
+
+def fetch_ollama_models():
+    """Query Ollama for installed models with detailed capabilities"""
+    # Ask the Ollama REST API instead of spawning and parsing 'ollama list'
+    response = _ollama_session.get(f'{OLLAMA_API_URL}/api/tags', timeout=2)
+    
+    if response.status_code != 200:
+        # If Ollama is not available, return empty list
+        return {
+            'success': True,
+            'models': [],
+            'total': 0,
+            'message': 'Ollama not available or no models installed'
+        }
+    
+    models = []
+    
+    for entry in response.json().get('models', []):
+        model_name = entry.get('name') or entry.get('model')
+        if not model_name:
+            continue
+        
+        # Get detailed model information from ollama show
+        model_details = get_model_details_from_ollama(model_name)
+        
+        models.append({
+            'name': model_name,
+            'size': format_model_size(entry.get('size')),
+            'modified': entry.get('modified_at', 'Unknown'),
+            'capabilities': model_details['capabilities'],
+            'architecture': model_details['architecture'],
+            'parameters': model_details['parameters'],
+            'context_length': model_details['context_length'],
+            'quantization': model_details['quantization'],
+            'temperature': model_details['temperature'],
+            'top_p': model_details['top_p'],
+            'system_prompt': model_details['system_prompt'],
+            'license': model_details['license'],
+            'type': 'ollama'
+        })
+    
+    return {
+        'success': True,
+        'models': models,
+        'total': len(models)
+    }
+
 @app.route('/api/models', methods=['GET'])
+@cache_for(5)
 def get_ollama_models():
     """Get available Ollama models with detailed capabilities"""
     try:
-        # Try to get models from Ollama
-        result = subprocess.run(['ollama', 'list'], capture_output=True, text=True, timeout=10)
-        
-        if result.returncode != 0:
-            # If Ollama is not available, return empty list
-            return jsonify({
-                'success': True,
-                'models': [],
-                'total': 0,
-                'message': 'Ollama not available or no models installed'
-            })
-        
-        # Parse Ollama list output
-        lines = result.stdout.strip().split('\n')[1:]  # Skip header
-        models = []
-        
-        for line in lines:
-            if line.strip():
-                parts = line.split()
-                if len(parts) >= 2:
-                    model_name = parts[0]
-                    size = parts[1] if parts[1] != 'latest' else parts[2] if len(parts) > 2 else 'Unknown'
-                    modified = ' '.join(parts[2:]) if len(parts) > 2 else 'Unknown'
-                    
-                    # Get detailed model information from ollama show
-                    model_details = get_model_details_from_ollama(model_name)
-                    
-                    models.append({
-                        'name': model_name,
-                        'size': size,
-                        'modified': modified,
-                        'capabilities': model_details['capabilities'],
-                        'architecture': model_details['architecture'],
-                        'parameters': model_details['parameters'],
-                        'context_length': model_details['context_length'],
-                        'quantization': model_details['quantization'],
-                        'temperature': model_details['temperature'],
-                        'top_p': model_details['top_p'],
-                        'system_prompt': model_details['system_prompt'],
-                        'license': model_details['license'],
-                        'type': 'ollama'
-                    })
-        
-        return jsonify({
-            'success': True,
-            'models': models,
-            'total': len(models)
-        })
+        payload = get_cached_models_payload(_MODELS_TTL)
+        if payload is None:
+            refresh = refresh_models_in_background()
+            try:
+                payload = refresh.result(timeout=_MODELS_WAIT)
+            except concurrent.futures.TimeoutError:
+                # Serve the previous list while Ollama finishes; wait only if there is nothing to serve
+                payload = _models_cache['payload'] or refresh.result()
+        return conditional_json(payload, payload_version_key(payload))
         
-    except subprocess.TimeoutExpired:
+    except requests.Timeout:
         return jsonify({
             'success': False,
             'error': 'Timeout connecting to Ollama'
         }), 408
-    except FileNotFoundError:
+    except requests.ConnectionError:
         return jsonify({
             'success': False,
-            'error': 'Ollama not installed'
+            'error': 'Ollama not running'
         }), 404
     except Exception as e:
         return jsonify({
@@ -903,6 +1324,15 @@ def get_ollama_models():
             'error': str(e)
         }), 500
 
+@app.route('/api/models/refresh', methods=['POST'])
+def refresh_ollama_models():
+    """Force the cached Ollama model list to be rebuilt"""
+    invalidate_models_cache()
+    return jsonify({
+        'success': True,
+        'message': 'Model cache cleared'
+    })
+
 @app.route('/api/models/<path:model_name>', methods=['PUT'])
 def update_model(model_name):
     """Update an Ollama model's system prompt and parameters"""
@@ -966,6 +1396,7 @@ SYSTEM "{system_prompt}"
                                   capture_output=True, text=True, timeout=30)
             
             if result.returncode == 0:
+                invalidate_models_cache()
                 return jsonify({
                     'success': True,
                     'message': f'Model {model_name} updated successfully',
@@ -992,6 +1423,7 @@ SYSTEM "{system_prompt}"
         }), 500
 
 @app.route('/api/models/<path:model_name>/details', methods=['GET'])
+@cache_for(30)
 def get_model_details(model_name):
     """Get detailed information about a specific model"""
     try:
@@ -1150,12 +1582,14 @@ def parse_model_details(output):
 def get_chromadb_collections():
     """Get all ChromaDB collections"""
     try:
-        collections = chromadb_service.list_collections()
-        return jsonify({
+        collections = _single_flight.do('chromadb_collections', chromadb_service.list_collections)
+        payload = {
             'success': True,
             'collections': collections,
             'total': len(collections)
-        })
+        }
+        # No change counter for ChromaDB, so the payload itself is the version
+        return conditional_json(payload, payload_version_key(payload))
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1163,10 +1597,16 @@ def get_chromadb_collections():
         }), 500
 
 @app.route('/api/chromadb/collections/<collection_name>', methods=['GET'])
+@cache_for(30)
 def get_collection_info(collection_name):
     """Get information about a specific collection"""
     try:
         info = chromadb_service.get_collection_info(collection_name)
+        if not info:
+            return jsonify({
+                'success': False,
+                'error': f'Collection {collection_name} not found'
+            }), 404
         return jsonify({
             'success': True,
             'collection': info
@@ -1208,7 +1648,7 @@ def query_collection(collection_name):
 def delete_collection(collection_name):
     """Delete a ChromaDB collection"""
     try:
-        success = chromadb_service.delete_collection(collection_name)
+        success = _IO_POOL.submit(chromadb_service.delete_collection, collection_name).result()
         return jsonify({
             'success': success,
             'message': f"Collection '{collection_name}' {'deleted' if success else 'not found'}"
@@ -1251,11 +1691,15 @@ def query_knowledge_base(job_id):
 def health_check():
     """Health check endpoint"""
     try:
+        # Query the database and ChromaDB concurrently
+        datasets_future = _IO_POOL.submit(db.get_all_datasets)
+        collections_future = _IO_POOL.submit(chromadb_service.list_collections)
+        
         # Get dataset count from database
-        datasets = db.get_all_datasets()
+        datasets = datasets_future.result()
         
         # Get ChromaDB collections count
-        chromadb_collections = chromadb_service.list_collections()
+        chromadb_collections = collections_future.result()
         
         return jsonify({
             'status': 'healthy',
@@ -1280,23 +1724,21 @@ def update_training_progress(job_id):
         data = request.get_json()
         progress = data.get('progress', 0.0)
         
-        # Prepare update data with detailed progress info
-        update_data = {'progress': progress}
-        
-        # Add detailed progress information if available
+        # Detailed step information is kept in the job's metrics
+        step_details = {}
         if 'current_step' in data:
-            update_data['current_step'] = data['current_step']
+            step_details['current_step'] = data['current_step']
         if 'total_steps' in data:
-            update_data['total_steps'] = data['total_steps']
+            step_details['total_steps'] = data['total_steps']
         if 'epoch' in data:
-            update_data['current_epoch'] = data['epoch']
+            step_details['current_epoch'] = data['epoch']
         if 'total_epochs' in data:
-            update_data['total_epochs'] = data['total_epochs']
+            step_details['total_epochs'] = data['total_epochs']
         if 'step_progress' in data:
-            update_data['step_progress'] = data['step_progress']
+            step_details['step_progress'] = data['step_progress']
         
-        # Update the training job progress
-        db.update_training_job(job_id, update_data)
+        # Buffered: reports arrive every few steps, the database sees one batched write per flush interval
+        db.progress_buffer.push(job_id, progress, step_details)
         
         # Log the detailed progress
         step_info = ""
@@ -1351,36 +1793,40 @@ def update_training_output(job_id):
             'error': str(e)
         }), 500
 
+# Stuck-training thresholds
+_TIMEOUT_LORA = timedelta(minutes=30)
+_TIMEOUT_OTHER = timedelta(minutes=10)
+_STUCK_PROGRESS = 0.5  # Less than 50% progress
+
 @app.route('/api/detect-stuck-training', methods=['POST'])
 def detect_stuck_training():
     """Detect and fix stuck training jobs"""
     try:
-        import time
-        from datetime import datetime, timedelta
-        
         # Get all running training jobs
         jobs = db.get_training_jobs()
         stuck_jobs = []
         
+        # Compute the wall clock and cutoffs once for the whole scan
+        now = datetime.now()
+        cutoff_lora = now - _TIMEOUT_LORA
+        cutoff_other = now - _TIMEOUT_OTHER
+        
         for job in jobs:
             if job['status'] == 'RUNNING':
                 started_at = job.get('started_at')
                 if started_at:
                     start_time = datetime.fromisoformat(started_at)
-                    elapsed = datetime.now() - start_time
                     
-                    # Check if job has been running too long
-                    timeout_minutes = 30 if job['training_type'] == 'LoRA' else 10
+                    # Check if job has been running too long without reaching 50% progress
+                    cutoff = cutoff_lora if job['training_type'] == 'LoRA' else cutoff_other
                     
-                    if elapsed > timedelta(minutes=timeout_minutes):
-                        # Check if progress hasn't changed in last 5 minutes
-                        if job['progress'] < 0.5:  # Less than 50% progress
-                            stuck_jobs.append({
-                                'job_id': job['id'],
-                                'job_name': job['name'],
-                                'elapsed_minutes': int(elapsed.total_seconds() / 60),
-                                'progress': job['progress']
-                            })
+                    if start_time < cutoff and job['progress'] < _STUCK_PROGRESS:
+                        stuck_jobs.append({
+                            'job_id': job['id'],
+                            'job_name': job['name'],
+                            'elapsed_minutes': int((now - start_time).total_seconds() / 60),
+                            'progress': job['progress']
+                        })
         
         # Mark stuck jobs as failed
         for stuck_job in stuck_jobs:
@@ -1406,20 +1852,14 @@ def detect_stuck_training():
 def get_training_history():
     """Get comprehensive training history with detailed information"""
     try:
-        # Get all training jobs
-        jobs = db.get_training_jobs()
-        
-        # Get all datasets for reference
-        datasets = db.get_all_datasets()
-        dataset_map = {d['id']: d for d in datasets}
+        # Get all training jobs with their datasets joined in
+        jobs = db.get_training_jobs_with_datasets()
         
         # Process each job with detailed information
         history = []
         for job in jobs:
             # Get dataset information
-            dataset_info = None
-            if job.get('dataset_id'):
-                dataset_info = dataset_map.get(job['dataset_id'])
+            dataset_info = job['dataset']
             
             # Calculate duration if completed
             duration = None
@@ -1570,6 +2010,22 @@ def get_training_job_details(job_id):
             'error': str(e)
         }), 500
 
+def warm_up():
+    """Touch the database, ChromaDB, the embedding model and the Ollama model list once"""
+    started = time.perf_counter()
+    try:
+        db.get_all_datasets()
+        chromadb_service.list_collections()
+        chromadb_service.embed_model.encode(['warm-up'])
+        refresh_models_in_background()
+        print(f"🔥 Warm-up finished in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        print(f"⚠️ Warm-up failed: {e}")
+
+def start_warm_up():
+    """Run warm_up in a daemon thread so startup isn't delayed"""
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
 if __name__ == '__main__':
     print("🚀 Starting AI Refinement Dashboard API Server...")
     print("📊 Database initialized...")
@@ -1586,4 +2042,5 @@ if __name__ == '__main__':
     print("  GET  /api/health - Health check")
     print("  SocketIO: training_progress - Real-time training updates")
     
+    start_warm_up()
     socketio.run(app, host='0.0.0.0', port=5000, debug=False)
@@ -6,7 +6,9 @@ Provides professional-grade vector database operations for RAG training
 import os
 import json
 import math
+import functools
 from typing import List, Dict, Any, Optional
+import numpy as np
 from sentence_transformers import SentenceTransformer
 import chromadb
 from chromadb.config import Settings
@@ -35,6 +37,9 @@ class ChromaDBService:
         # Initialize embedding model
         self.embed_model = SentenceTransformer("all-MiniLM-L6-v2")
         
+        # Cache query embeddings (repeat questions skip the embedding model entirely)
+        self._embed_cached = functools.lru_cache(maxsize=4096)(self._embed)
+        
         print(f"✅ ChromaDB initialized at {persist_directory}")
     
     def create_collection(self, collection_name: str, description: str = "") -> bool:
@@ -152,40 +157,75 @@ class ChromaDBService:
             print(f"❌ Error ingesting dataset: {e}")
             return False
     
+    def _embed(self, text: str) -> bytes:
+        """Embed a single query and return its raw float32 buffer (hashable for the LRU cache)"""
+        embedding = self.embed_model.encode([text])[0]
+        return np.asarray(embedding, dtype=np.float32).tobytes()
+    
+    def embed_query(self, text: str) -> np.ndarray:
+        """Get the float32 embedding for a query, served from the cache when possible"""
+        return np.frombuffer(self._embed_cached(text), dtype=np.float32)
+    
+    def embed_queries(self, texts: List[str]) -> np.ndarray:
+        """Stack query embeddings into one contiguous (B, D) float32 array"""
+        return np.stack([self.embed_query(text) for text in texts])
+    
+    def _format_results(self, results: Dict[str, Any], index: int = 0) -> List[Dict[str, Any]]:
+        """Format one query's results from a Chroma query response"""
+        formatted_results = []
+        if results['documents'] and results['documents'][index]:
+            for i, doc in enumerate(results['documents'][index]):
+                formatted_results.append({
+                    'document': doc,
+                    'metadata': results['metadatas'][index][i] if results['metadatas'] else {},
+                    'distance': results['distances'][index][i] if results['distances'] else 0,
+                    'id': results['ids'][index][i] if results['ids'] else f"result-{i}"
+                })
+        return formatted_results
+    
     def query_collection(self, collection_name: str, query_text: str, 
-                        n_results: int = 5) -> List[Dict[str, Any]]:
+                        n_results: int = 5, query_embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """Query collection for similar documents"""
         try:
             collection = self.get_collection(collection_name)
             if not collection:
                 return []
             
-            # Generate query embedding
-            query_embedding = self.embed_model.encode([query_text]).tolist()
+            # Use the precomputed embedding if given, otherwise the cached one
+            if query_embedding is None:
+                query_embedding = self.embed_query(query_text)
             
-            # Query collection
+            # Query collection (precomputed embeddings bypass Chroma's embedding function)
             results = collection.query(
-                query_embeddings=query_embedding,
+                query_embeddings=np.atleast_2d(query_embedding),
                 n_results=n_results
             )
             
-            # Format results
-            formatted_results = []
-            if results['documents'] and results['documents'][0]:
-                for i, doc in enumerate(results['documents'][0]):
-                    formatted_results.append({
-                        'document': doc,
-                        'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
-                        'distance': results['distances'][0][i] if results['distances'] else 0,
-                        'id': results['ids'][0][i] if results['ids'] else f"result-{i}"
-                    })
-            
-            return formatted_results
+            return self._format_results(results)
             
         except Exception as e:
             print(f"❌ Error querying collection '{collection_name}': {e}")
             return []
     
+    def query_collection_batch(self, collection_name: str, query_texts: List[str],
+                               n_results: int = 5) -> List[List[Dict[str, Any]]]:
+        """Query collection with several queries in a single Chroma call"""
+        try:
+            collection = self.get_collection(collection_name)
+            if not collection or not query_texts:
+                return [[] for _ in query_texts]
+            
+            results = collection.query(
+                query_embeddings=self.embed_queries(query_texts),
+                n_results=n_results
+            )
+            
+            return [self._format_results(results, i) for i in range(len(query_texts))]
+            
+        except Exception as e:
+            print(f"❌ Error batch querying collection '{collection_name}': {e}")
+            return [[] for _ in query_texts]
+    
     def get_collection_info(self, collection_name: str) -> Dict[str, Any]:
         """Get information about a collection"""
         try:
@@ -234,10 +274,11 @@ class ChromaDBService:
         # Ingest dataset
         return self.ingest_dataset(collection_name, dataset_data)
     
-    def query_knowledge_base(self, job_id: int, query: str, n_results: int = 3) -> List[Dict[str, Any]]:
+    def query_knowledge_base(self, job_id: int, query: str, n_results: int = 3,
+                             embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """Query knowledge base for a specific training job"""
         collection_name = f"job_{job_id}_kb"
-        return self.query_collection(collection_name, query, n_results)
+        return self.query_collection(collection_name, query, n_results, query_embedding=embedding)
 
 
 # Global instance
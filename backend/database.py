@@ -7,21 +7,746 @@ Handles SQLite database operations for datasets and training jobs
 import sqlite3
 import json
 import os
+import copy
+import contextlib
+import logging
+import subprocess
+import functools
+import threading
+import time
+import queue
+import urllib.parse
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # zlib keeps metadata compression working without the optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
 
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'ai_dashboard.db')
+VERSIONED_TABLES = ('datasets', 'training_jobs', 'evaluations')
+# Writes through this process evict immediately; the TTL bounds staleness from other processes
+ROW_CACHE_TTL = 2.0  # seconds
+ROW_CACHE_SIZE = 256  # rows per by-id cache, least recently used evicted first
+READ_POOL_SIZE = int(os.environ.get('AI_REPUBLIC_DB_READERS', 4))
+OLLAMA_LIST_TTL = 2.0  # seconds; several jobs finishing together share one `ollama list`
+INSERT_BATCH_SIZE = 1000  # rows per executemany transaction for streamed imports
+PROGRESS_FLUSH_INTERVAL = 1.0  # seconds; buffered per-step progress is written at most this often
+DATASET_INSERT_COLUMNS = '''name, description, dataset_id, type, sample_count, loaded_samples,
+                    size, format, license, tags, is_favorite, is_public, source, metadata, metadata_blob'''
+# List projection: skips metadata_blob and pulls the lightweight metadata fields out with JSON1,
+# json_quote keeps objects/arrays as JSON text so only those two need parsing in Python
+DATASET_LIST_COLUMNS = '''id, name, description, dataset_id, type, sample_count, loaded_samples, size, format,
+                    license, tags, is_favorite, is_public, created_at, last_modified, source,
+                    json_extract(metadata, '$.loaded_at') AS loaded_at,
+                    json_extract(metadata, '$.split_used') AS split_used,
+                    json_quote(json_extract(metadata, '$.format_analysis')) AS format_analysis_json,
+                    json_quote(json_extract(metadata, '$.samples_preview')) AS samples_preview_json'''
+# Variant for the *_json readers: SQLite assembles the lightweight metadata object itself
+DATASET_LIST_JSON_COLUMNS = '''id, name, description, dataset_id, type, sample_count, loaded_samples, size, format,
+                    license, tags, is_favorite, is_public, created_at, last_modified, source,
+                    json_object('loaded_at', json_extract(metadata, '$.loaded_at'),
+                                'split_used', json_extract(metadata, '$.split_used'),
+                                'format_analysis', json_extract(metadata, '$.format_analysis'),
+                                'samples_preview', COALESCE(json_extract(metadata, '$.samples_preview'), json_array())
+                    ) AS metadata'''
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Statements built once so every call hits the connection's prepared statement cache
+INSERT_DATASET_SQL = f'''
+    INSERT INTO datasets ({DATASET_INSERT_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_DATASET_IF_ABSENT_SQL = INSERT_DATASET_SQL + '''
+    ON CONFLICT(dataset_id) DO NOTHING
+    RETURNING *
+'''
+# Idempotent import keyed on dataset_id: refresh the imported fields, keep the user's is_favorite/is_public
+UPSERT_DATASET_SQL = INSERT_DATASET_SQL + '''
+    ON CONFLICT(dataset_id) DO UPDATE SET
+        name = excluded.name, description = excluded.description, type = excluded.type,
+        sample_count = excluded.sample_count, loaded_samples = excluded.loaded_samples, size = excluded.size,
+        format = excluded.format, license = excluded.license, tags = excluded.tags, source = excluded.source,
+        metadata = excluded.metadata, metadata_blob = excluded.metadata_blob, last_modified = CURRENT_TIMESTAMP
+'''
+# Newest first; id breaks ties between rows created in the same second so keyset pages are stable
+LIST_DATASETS_SQL = f'SELECT {DATASET_LIST_COLUMNS} FROM datasets ORDER BY created_at DESC, id DESC'
+LIST_DATASETS_JSON_SQL = f'SELECT {DATASET_LIST_JSON_COLUMNS} FROM datasets ORDER BY created_at DESC, id DESC'
+# Keyset pages: the first page, then the rows after a (created_at, id) cursor; LIMIT -1 means no limit
+FIRST_PAGE_DATASETS_SQL = LIST_DATASETS_SQL + ' LIMIT ?'
+NEXT_PAGE_DATASETS_SQL = f'''SELECT {DATASET_LIST_COLUMNS} FROM datasets WHERE (created_at, id) < (?, ?)
+    ORDER BY created_at DESC, id DESC LIMIT ?'''
+DATASET_SUMMARY_SQL = f'SELECT {DATASET_LIST_COLUMNS} FROM datasets WHERE id = ?'
+# Extracted columns folded into the lightweight 'metadata' key of LazyRow datasets
+DATASET_LIST_HIDDEN = ('loaded_at', 'split_used', 'format_analysis_json', 'samples_preview_json')
+# dataset_id as a lookup, so ids of missing datasets are stored as NULL instead of failing the foreign key
+DATASET_REF_SQL = '(SELECT id FROM datasets WHERE id = ?)'
+INSERT_TRAINING_JOB_SQL = f'''
+    INSERT INTO training_jobs (
+        name, description, job_type, custom_capabilities, maker, version, base_model, model_name,
+        dataset_id, status, training_type, progress, metrics, config, temperature, top_p, context_length
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, {DATASET_REF_SQL}, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+# Static statement for the trainers' frequent progress ticks, so they skip the dynamic UPDATE builder
+UPDATE_JOB_PROGRESS_SQL = 'UPDATE training_jobs SET progress = ?, status = COALESCE(?, status) WHERE id = ?'
+# Merge a JSON object into metrics inside SQLite (RFC 7396: null removes a key); the CASTs accept TEXT or BLOB rows
+PATCH_JOB_METRICS_SQL = '''
+    UPDATE training_jobs
+    SET metrics = CAST(json_patch(COALESCE(NULLIF(CAST(metrics AS TEXT), ''), '{}'), ?) AS BLOB)
+    WHERE id = ?
+'''
+# ProgressBuffer's batched write; only running jobs, so a late flush can't undo a finished job's final state
+FLUSH_JOB_PROGRESS_SQL = '''
+    UPDATE training_jobs
+    SET progress = ?, metrics = CAST(json_patch(COALESCE(NULLIF(CAST(metrics AS TEXT), ''), '{}'), ?) AS BLOB)
+    WHERE id = ? AND status = 'RUNNING'
+'''
+LIST_TRAINING_JOBS_SQL = 'SELECT * FROM training_jobs ORDER BY created_at DESC, id DESC'
+FIRST_PAGE_TRAINING_JOBS_SQL = LIST_TRAINING_JOBS_SQL + ' LIMIT ?'
+NEXT_PAGE_TRAINING_JOBS_SQL = '''SELECT * FROM training_jobs WHERE (created_at, id) < (?, ?)
+    ORDER BY created_at DESC, id DESC LIMIT ?'''
+INSERT_EVALUATION_SQL = f'''
+    INSERT INTO evaluations (
+        model_name, dataset_id, evaluation_type, before_metrics,
+        after_metrics, improvement, notes
+    ) VALUES (?, {DATASET_REF_SQL}, ?, ?, ?, ?, ?)
+'''
+# Jobs with their dataset in one LEFT JOIN on datasets' primary key instead of a lookup per job
+LIST_TRAINING_JOBS_WITH_DATASETS_SQL = '''
+    SELECT j.*, d.id AS dataset_pk, d.name AS dataset_name, d.description AS dataset_description,
+           d.dataset_id AS dataset_hf_id, d.sample_count AS dataset_sample_count, d.loaded_samples AS dataset_loaded_samples
+    FROM training_jobs j
+    LEFT JOIN datasets d ON d.id = j.dataset_id
+    ORDER BY j.created_at DESC, j.id DESC
+'''
+# Joined dataset columns folded into the 'dataset' key of each job
+JOINED_DATASET_COLUMNS = {
+    'id': 'dataset_pk', 'name': 'dataset_name', 'description': 'dataset_description', 'dataset_id': 'dataset_hf_id',
+    'sample_count': 'dataset_sample_count', 'loaded_samples': 'dataset_loaded_samples',
+}
+LIST_EVALUATIONS_SQL = 'SELECT * FROM evaluations ORDER BY created_at DESC, id DESC'
+# INSERT ... RETURNING id hands back the new ID with the insert itself (SQLite 3.35+)
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# JSON columns decoded by the list queries, with the empty value used for NULL/''
+# tags, metrics, config and before/after_metrics are written as UTF-8 BLOBs; rows from older versions are TEXT
+ROW_BATCH_SIZE = 256
+DATASET_JSON_COLUMNS = (('tags', list), ('format_analysis_json', type(None)), ('samples_preview_json', list))
+TRAINING_JOB_JSON_COLUMNS = (('metrics', dict), ('config', dict))
+EVALUATION_JSON_COLUMNS = (('before_metrics', dict), ('after_metrics', dict))
+# JSON columns the *_json readers splice into each row as stored, with the bytes used for NULL/''
+DATASET_RAW_JSON_COLUMNS = (('tags', b'[]'), ('metadata', b'{}'))
+TRAINING_JOB_RAW_JSON_COLUMNS = (('metrics', b'{}'), ('config', b'{}'))
+EVALUATION_RAW_JSON_COLUMNS = (('before_metrics', b'{}'), ('after_metrics', b'{}'))
+
+if orjson is not None:
+    def _loads(text):
+        """Parse a JSON column; rows written by json.dumps may contain NaN, which orjson rejects"""
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            return json.loads(text)
+
+    def _dumps_bytes(obj) -> bytes:
+        """Serialize a JSON value to UTF-8 bytes, stored as a BLOB without a str round-trip"""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, default=str)
+
+    def _dumps(obj) -> str:
+        """Serialize a JSON column (SQLite TEXT wants str)"""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, default=str).decode()
+else:
+    _loads = json.loads
+
+    def _dumps_bytes(obj) -> bytes:
+        """Serialize a JSON value to UTF-8 bytes"""
+        return json.dumps(obj, default=str).encode()
+
+    def _dumps(obj) -> str:
+        """Serialize a JSON column"""
+        return json.dumps(obj, default=str)
+
+def _compress_json(obj) -> bytes:
+    """Serialize and compress a JSON value for a BLOB column"""
+    raw = _dumps_bytes(obj)
+    return zstandard.compress(raw, 3) if zstandard else zlib.compress(raw, 6)
+
+def _decompress_json(blob: bytes):
+    """Decompress and parse a BLOB written by _compress_json (zstd or zlib)"""
+    raw = zstandard.decompress(blob) if blob[:4] == ZSTD_MAGIC else zlib.decompress(blob)
+    return _loads(raw)
+
+def _json_bytes(value, empty: bytes) -> bytes:
+    """A stored JSON column as bytes ready to splice into a response"""
+    if not value:
+        return empty
+    if isinstance(value, str):
+        value = value.encode()
+    # Rows written by json.dumps may hold NaN/Infinity, which isn't valid JSON; re-encode those
+    if b'NaN' in value or b'Infinity' in value:
+        return _dumps_bytes(_loads(value))
+    return value
+
+def _row_json_layout(names: Tuple[str, ...], raw_columns) -> Tuple[tuple, tuple]:
+    """Split a query's columns into plain (index, name) pairs and spliced (index, b',"key":', empty) JSON columns"""
+    raw = dict(raw_columns)
+    plain = tuple((index, name) for index, name in enumerate(names) if name not in raw)
+    spliced = tuple((names.index(name), f',"{name}":'.encode(), empty) for name, empty in raw_columns)
+    return plain, spliced
+
+def _row_json(row: tuple, plain: tuple, spliced: tuple) -> bytes:
+    """Serialize a tuple row as a JSON object, splicing its JSON columns in without parsing them"""
+    parts = [_dumps_bytes({name: row[index] for index, name in plain})[:-1]]
+    for index, key, empty in spliced:
+        parts.append(key)
+        parts.append(_json_bytes(row[index], empty))
+    parts.append(b'}')
+    return b''.join(parts)
+
+def _light_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the metadata fields the dataset list shows"""
+    return {
+        'loaded_at': metadata.get('loaded_at'),
+        'split_used': metadata.get('split_used'),
+        'format_analysis': metadata.get('format_analysis'),  # Include format analysis!
+        'samples_preview': (metadata.get('samples_preview') or [])[:5]  # Only first 5 samples for preview
+    }
+
+def _rows_to_dicts(rows: List[tuple], names: Tuple[str, ...], json_columns: Tuple[Tuple[int, type], ...], loads) -> List[Dict[str, Any]]:
+    """Turn tuple rows into dicts, parsing the JSON columns given as (index, empty type) pairs"""
+    result = []
+    for row in rows:
+        item = dict(zip(names, row))
+        for index, empty in json_columns:
+            value = row[index]
+            item[names[index]] = loads(value) if value else empty()
+        result.append(item)
+    return result
+
+try:
+    from db_fastpath import rows_to_dicts  # Optional Cython build of _rows_to_dicts (db_fastpath.pyx)
+except ImportError:
+    rows_to_dicts = _rows_to_dicts
+
+class RowLayout:
+    """Column positions and lazy decoders shared by every LazyRow from one query"""
+    __slots__ = ('keys', 'positions', 'decoders')
+    
+    def __init__(self, names: Tuple[str, ...], json_columns=(), computed: Optional[Dict[str, Any]] = None, hidden=()):
+        self.positions = {name: index for index, name in enumerate(names)}
+        self.decoders = {name: self._json_decoder(self.positions[name], empty) for name, empty in json_columns}
+        self.decoders.update(computed or {})
+        self.keys = tuple(name for name in names if name not in hidden) + tuple(
+            name for name in (computed or {}) if name not in self.positions)
+    
+    @staticmethod
+    def _json_decoder(index: int, empty: type):
+        def decode(layout, row):
+            value = row[index]
+            return _loads(value) if value else empty()
+        return decode
+    
+    def value(self, row: tuple, key: str):
+        """Decode one key of a row"""
+        decoder = self.decoders.get(key)
+        if decoder is not None:
+            return decoder(self, row)
+        if key not in self.keys:
+            raise KeyError(key)
+        return row[self.positions[key]]
+
+class LazyRow(MutableMapping):
+    """Dict-like row that only parses a JSON column when that key is read"""
+    __slots__ = ('_row', '_layout', '_values')
+    
+    def __init__(self, row: tuple, layout: RowLayout):
+        self._row = row
+        self._layout = layout
+        self._values = {}
+    
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            if self._row is None:
+                raise
+        value = self._values[key] = self._layout.value(self._row, key)
+        return value
+    
+    def _materialize(self):
+        """Decode every key so the row can be changed like a plain dict"""
+        if self._row is not None:
+            self._values = {key: self[key] for key in self._layout.keys}
+            self._row = None
+    
+    def __setitem__(self, key, value):
+        self._materialize()
+        self._values[key] = value
+    
+    def __delitem__(self, key):
+        self._materialize()
+        del self._values[key]
+    
+    def __iter__(self):
+        return iter(self._layout.keys if self._row is not None else self._values)
+    
+    def __len__(self):
+        return len(self._layout.keys if self._row is not None else self._values)
+    
+    def __contains__(self, key):
+        return key in (self._layout.keys if self._row is not None else self._values)
+    
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+    
+    def __repr__(self):
+        return f"LazyRow({dict(self)!r})"
+
+def _dataset_list_metadata(layout: RowLayout, row: tuple) -> Dict[str, Any]:
+    """Rebuild the lightweight dataset metadata from the columns DATASET_LIST_COLUMNS extracted"""
+    format_analysis = row[layout.positions['format_analysis_json']]
+    samples_preview = row[layout.positions['samples_preview_json']]
+    return {
+        'loaded_at': row[layout.positions['loaded_at']],
+        'split_used': row[layout.positions['split_used']],
+        'format_analysis': _loads(format_analysis) if format_analysis else None,
+        'samples_preview': ((_loads(samples_preview) if samples_preview else None) or [])[:5]
+    }
+
+def _joined_dataset(layout: RowLayout, row: tuple) -> Optional[Dict[str, Any]]:
+    """Build a job's 'dataset' from the JOINED_DATASET_COLUMNS, or None when it has no matching dataset"""
+    if row[layout.positions['dataset_pk']] is None:
+        return None
+    return {key: row[layout.positions[column]] for key, column in JOINED_DATASET_COLUMNS.items()}
+
+@functools.lru_cache(maxsize=None)
+def _returning_sql(sql: str, columns: str = 'id') -> str:
+    """Append a RETURNING clause to an INSERT statement once"""
+    return f'{sql.rstrip()} RETURNING {columns}'
+
+def _insert_returning_id(cursor: sqlite3.Cursor, sql: str, params: tuple) -> int:
+    """Run an INSERT and return the new row ID"""
+    if HAS_RETURNING:
+        return cursor.execute(_returning_sql(sql), params).fetchone()[0]
+    cursor.execute(sql, params)
+    return cursor.lastrowid
+
+def _insert_returning_row(cursor: sqlite3.Cursor, sql: str, params: tuple, table: str) -> sqlite3.Row:
+    """Run an INSERT and return the stored row, column defaults included"""
+    if HAS_RETURNING:
+        return cursor.execute(_returning_sql(sql, '*'), params).fetchone()
+    cursor.execute(sql, params)
+    return cursor.execute(f'SELECT * FROM {table} WHERE id = ?', (cursor.lastrowid,)).fetchone()
+
+def _page_query(first_sql: str, next_sql: str, limit: Optional[int], before: Optional[Tuple[str, int]]) -> Tuple[str, tuple]:
+    """Pick the statement and parameters for one keyset page"""
+    limit = -1 if limit is None else limit
+    if before is None:
+        return first_sql, (limit,)
+    return next_sql, (before[0], before[1], limit)
+
+def _decode_row(row: sqlite3.Row, json_columns) -> Dict[str, Any]:
+    """Turn a full row into a dict with its JSON columns parsed"""
+    item = dict(row)
+    for name, empty in json_columns:
+        item[name] = _loads(item[name]) if item[name] else empty()
+    return item
+
+class RawJSON(bytes):
+    """Already-encoded JSON that update_* methods store as-is instead of decoding and re-encoding it"""
+
+def _encode_json_column(value) -> bytes:
+    """Encode a JSON column value as UTF-8 bytes (stored as a BLOB), passing RawJSON/bytes straight through"""
+    if isinstance(value, bytes):
+        return value
+    return _dumps_bytes(value)
+
+def _encode_optional_json_column(value):
+    """Like _encode_json_column, but strings and None are stored as given (training job config/metrics)"""
+    if isinstance(value, bytes):
+        return value
+    return _dumps_bytes(value) if isinstance(value, (dict, list)) else value
+
+def _encode_dataset_metadata(value):
+    """Split dataset metadata into the lightweight TEXT column and the compressed full BLOB"""
+    if isinstance(value, bytes):
+        # The light copy needs the parsed fields, so raw metadata is decoded once here
+        value = _loads(value)
+    value = value or {}
+    return _dumps(_light_metadata(value)), _compress_json(value)
+
+# Per-table encoders for update_* values; each returns the values for the column(s) in UPDATE_COLUMN_EXPANSIONS
+DATASET_UPDATE_ENCODERS = {
+    'tags': lambda value: (_encode_json_column(value),),
+    'metadata': _encode_dataset_metadata,
+}
+TRAINING_JOB_UPDATE_ENCODERS = {
+    'custom_capabilities': lambda value: (_dumps(value) if isinstance(value, (dict, list)) else value,),
+    'metrics': lambda value: (_encode_optional_json_column(value),),
+    'config': lambda value: (_encode_optional_json_column(value),),
+}
+EVALUATION_UPDATE_ENCODERS = {
+    'before_metrics': lambda value: (_encode_json_column(value),),
+    'after_metrics': lambda value: (_encode_json_column(value),),
+}
+# Update keys stored in more than one column
+# Columns update_* may set; keys come from callers (including request bodies) and are interpolated into SQL
+DATASET_UPDATABLE_COLUMNS = frozenset({
+    'name', 'description', 'type', 'sample_count', 'loaded_samples', 'size', 'format', 'license',
+    'tags', 'is_favorite', 'is_public', 'source', 'metadata',
+})
+TRAINING_JOB_UPDATABLE_COLUMNS = frozenset({
+    'name', 'description', 'job_type', 'custom_capabilities', 'maker', 'version', 'base_model', 'model_name',
+    'actual_model_name', 'dataset_id', 'status', 'training_type', 'progress', 'metrics', 'config',
+    'temperature', 'top_p', 'context_length', 'started_at', 'completed_at', 'error_message',
+})
+EVALUATION_UPDATABLE_COLUMNS = frozenset({
+    'model_name', 'dataset_id', 'evaluation_type', 'before_metrics', 'after_metrics', 'improvement', 'notes',
+    'status', 'started_at', 'completed_at', 'error_message',
+})
+UPDATE_COLUMN_EXPANSIONS = {('datasets', 'metadata'): ('metadata', 'metadata_blob')}
+
+@functools.lru_cache(maxsize=128)
+def _update_sql(table: str, columns: Tuple[str, ...], key_column: str, touch_column: Optional[str] = None) -> str:
+    """Build an UPDATE statement once per (table, sorted update keys) shape"""
+    assignments = [
+        f"{name} = ?"
+        for column in columns
+        for name in UPDATE_COLUMN_EXPANSIONS.get((table, column), (column,))
+    ]
+    if touch_column:
+        assignments.append(f"{touch_column} = CURRENT_TIMESTAMP")
+    return f"UPDATE {table} SET {', '.join(assignments)} WHERE {key_column} = ?"
+
+# Child tables of datasets; {table} lets the migration that rebuilds them reuse the definition.
+# Deleting a dataset keeps its training jobs (dataset_id becomes NULL) and removes its evaluations.
+CREATE_TRAINING_JOBS_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        job_type TEXT DEFAULT 'experimental',
+        custom_capabilities TEXT,  -- JSON array of custom capabilities
+        maker TEXT,
+        version TEXT,
+        base_model TEXT NOT NULL,
+        model_name TEXT,  -- The actual model name that will be created
+        dataset_id INTEGER,
+        status TEXT DEFAULT 'PENDING',
+        training_type TEXT DEFAULT 'LoRA',
+        progress REAL DEFAULT 0.0,
+        metrics TEXT,  -- JSON object
+        temperature REAL DEFAULT 0.7,
+        top_p REAL DEFAULT 0.9,
+        context_length INTEGER DEFAULT 4096,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        completed_at TIMESTAMP,
+        error_message TEXT,
+        config TEXT,  -- JSON object for training configuration
+        actual_model_name TEXT,  -- Ollama model the job produced
+        FOREIGN KEY (dataset_id) REFERENCES datasets (id) ON DELETE SET NULL
+    )
+'''
+CREATE_EVALUATIONS_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        model_name TEXT NOT NULL,
+        dataset_id INTEGER,
+        evaluation_type TEXT DEFAULT 'accuracy',
+        before_metrics TEXT,  -- JSON object
+        after_metrics TEXT,   -- JSON object
+        improvement REAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        notes TEXT,
+        status TEXT DEFAULT 'PENDING',
+        started_at TIMESTAMP,
+        completed_at TIMESTAMP,
+        error_message TEXT,
+        updated_at TIMESTAMP,
+        FOREIGN KEY (dataset_id) REFERENCES datasets (id) ON DELETE CASCADE
+    )
+'''
+
+def _backfill_metadata_blob(cursor: sqlite3.Cursor):
+    """Move full dataset metadata into metadata_blob, leaving the lightweight fields in metadata"""
+    cursor.execute('SELECT id, metadata FROM datasets WHERE metadata IS NOT NULL AND metadata_blob IS NULL')
+    for row in cursor.fetchall():
+        metadata = _loads(row[1]) or {}
+        cursor.execute(
+            'UPDATE datasets SET metadata = ?, metadata_blob = ? WHERE id = ?',
+            (_dumps(_light_metadata(metadata)), _compress_json(metadata), row[0])
+        )
+
+def _rebuild_dataset_children(cursor: sqlite3.Cursor):
+    """Recreate training_jobs and evaluations so deleting a dataset applies their ON DELETE actions"""
+    # SQLite can't change a constraint in place: copy into a table with the new definition and swap it in.
+    # Indexes and triggers go with the old table; init_database recreates them after the migrations.
+    for table, create_sql in (('training_jobs', CREATE_TRAINING_JOBS_SQL), ('evaluations', CREATE_EVALUATIONS_SQL)):
+        # Ids left behind by earlier dataset deletes would fail the enforced foreign key
+        cursor.execute(f'UPDATE {table} SET dataset_id = NULL WHERE dataset_id NOT IN (SELECT id FROM datasets)')
+        cursor.execute(create_sql.format(table=f'{table}_new'))
+        new_columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({table}_new)')}
+        columns = ', '.join(row[1] for row in cursor.execute(f'PRAGMA table_info({table})') if row[1] in new_columns)
+        cursor.execute(f'INSERT INTO {table}_new ({columns}) SELECT {columns} FROM {table}')
+        # Keep the AUTOINCREMENT high-water mark so ids of deleted rows are never handed out again
+        cursor.execute(
+            "UPDATE sqlite_sequence SET seq = (SELECT seq FROM sqlite_sequence WHERE name = ?) WHERE name = ?",
+            (table, f'{table}_new')
+        )
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+
+# Schema changes applied once per database, tracked with PRAGMA user_version.
+# Append new steps at the end and mirror them in the CREATE TABLE statements in init_database.
+MIGRATIONS = [
+    ('v1_training_jobs_model_settings', [
+        'ALTER TABLE training_jobs ADD COLUMN custom_capabilities TEXT',
+        'ALTER TABLE training_jobs ADD COLUMN temperature REAL DEFAULT 0.7',
+        'ALTER TABLE training_jobs ADD COLUMN top_p REAL DEFAULT 0.9',
+        'ALTER TABLE training_jobs ADD COLUMN context_length INTEGER DEFAULT 4096',
+    ]),
+    ('v2_datasets_metadata_blob', [
+        'ALTER TABLE datasets ADD COLUMN metadata_blob BLOB',
+        _backfill_metadata_blob,
+    ]),
+    ('v3_runtime_status_columns', [
+        'ALTER TABLE training_jobs ADD COLUMN actual_model_name TEXT',
+        "ALTER TABLE evaluations ADD COLUMN status TEXT DEFAULT 'PENDING'",
+        'ALTER TABLE evaluations ADD COLUMN started_at TIMESTAMP',
+        'ALTER TABLE evaluations ADD COLUMN completed_at TIMESTAMP',
+        'ALTER TABLE evaluations ADD COLUMN error_message TEXT',
+        'ALTER TABLE evaluations ADD COLUMN updated_at TIMESTAMP',
+    ]),
+    ('v4_ascending_created_indexes', [
+        'DROP INDEX IF EXISTS idx_datasets_created',
+        'CREATE INDEX idx_datasets_created ON datasets(created_at)',
+        'DROP INDEX IF EXISTS idx_training_jobs_created',
+        'CREATE INDEX idx_training_jobs_created ON training_jobs(created_at)',
+        'DROP INDEX IF EXISTS idx_evaluations_created',
+        'CREATE INDEX idx_evaluations_created ON evaluations(created_at)',
+    ]),
+    ('v5_dataset_delete_actions', [
+        _rebuild_dataset_children,
+    ]),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def _merge_patches(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine two JSON merge patches into one that has the effect of applying first, then second"""
+    merged = dict(first)
+    for key, value in second.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_patches(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+class ProgressBuffer:
+    """Collects per-step training progress and writes each job's latest state in one transaction per interval"""
+    
+    def __init__(self, database: 'Database', interval: float = PROGRESS_FLUSH_INTERVAL):
+        self._db = database
+        self._interval = interval
+        self._pending = {}  # job_id -> (progress, metrics patch)
+        self._lock = threading.Lock()
+        # Held across a whole flush, so close() waits for a timer flush that is already writing
+        self._flush_lock = threading.Lock()
+        self._timer = None
+    
+    def push(self, job_id: int, progress: float, metrics: Optional[Dict[str, Any]] = None):
+        """Record a job's progress and a metrics patch; written by the next flush, at most interval seconds away"""
+        with self._lock:
+            patch = metrics or {}
+            previous = self._pending.get(job_id)
+            if previous is not None:
+                patch = _merge_patches(previous[1], patch)
+            self._pending[job_id] = (progress, patch)
+            if self._timer is None:
+                self._timer = threading.Timer(self._interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self) -> int:
+        """Write everything buffered now; returns the number of jobs written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                timer, self._timer = self._timer, None
+            if timer is not None:
+                timer.cancel()
+            if not pending:
+                return 0
+            return self._db.update_jobs_progress(
+                [(progress, _dumps(patch), job_id) for job_id, (progress, patch) in pending.items()])
+    
+    def _flush_on_timer(self):
+        """Timer callback: flush, logging instead of raising on the timer thread"""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning("⚠️ Failed to write buffered training progress: %s", e)
 
 class Database:
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db_path = db_path
+        self._job_cache = OrderedDict()
+        self._dataset_cache = OrderedDict()
+        # List query -> (table version, layout, tuple rows); tuples are immutable so hits can share them
+        self._list_cache = {}
+        self._cache_lock = threading.Lock()
+        # One writer connection plus a small pool of read-only connections that WAL lets run concurrently
+        self._writer = None
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._readers_lock = threading.Lock()
+        self._local = threading.local()
+        # SQLite allows one writer at a time; queue writers here instead of spinning on "database is locked"
+        self._write_lock = threading.RLock()
+        # Automatic evaluations shell out to ollama, so they run off the caller's thread
+        self._eval_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='auto-eval')
+        self._ollama_cache = (0.0, '')
+        # Per-step progress from training scripts, written in batches instead of one transaction per report
+        self.progress_buffer = ProgressBuffer(self)
         self.init_database()
     
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        """Open a new connection with the shared settings"""
+        if readonly:
+            target = f"file:{urllib.parse.quote(os.path.abspath(self.db_path))}?mode=ro"
+        else:
+            target = self.db_path
+        # Autocommit mode: reads run without an open transaction and writers issue BEGIN IMMEDIATE in session()
+        conn = sqlite3.connect(target, uri=readonly, check_same_thread=False, cached_statements=256, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-65536')  # 64 MiB page cache
+        conn.execute('PRAGMA mmap_size=268435456')  # 256 MB memory-mapped reads
+        # Off by default in SQLite; needed for the ON DELETE actions on training_jobs and evaluations
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+    
+    def _acquire_reader(self, block: bool = True) -> Optional[sqlite3.Connection]:
+        """Take a read-only connection from the pool, opening one while under READ_POOL_SIZE (None if busy and not block)"""
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if self._reader_count < READ_POOL_SIZE:
+                self._reader_count += 1
+                return self._connect(readonly=True)
+        return self._readers.get() if block else None
+    
+    @contextlib.contextmanager
+    def session(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection: a pooled reader, or the writer in one transaction that rolls back on error"""
+        if write:
+            with self._write_lock:
+                if self._writer is None:
+                    self._writer = self._connect()
+                conn = self._writer
+                if conn.in_transaction:
+                    # Nested write session on this thread: join the outer transaction
+                    yield conn
+                    return
+                # Take the write lock up front so the transaction can't fail to upgrade from a read lock
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+                conn.execute('COMMIT')
+            return
+        
+        conn = getattr(self._local, 'reader', None)
+        if conn is not None:
+            # Nested read session on this thread: reuse its reader instead of taking a second one
+            yield conn
+            return
+        conn = self._local.reader = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._local.reader = None
+            self._readers.put(conn)
+    
+    def close(self):
+        """Close the writer and pooled reader connections (call on shutdown)"""
+        # Write buffered progress and cancel its timer first, so nothing reopens the writer afterwards
+        try:
+            self.progress_buffer.flush()
+        except Exception as e:
+            logger.warning("⚠️ Failed to write buffered training progress: %s", e)
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._reader_count = 0
+    
+    def _cache_get(self, cache: OrderedDict, key) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached row if it is still fresh"""
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > ROW_CACHE_TTL:
+                del cache[key]
+                return None
+            cache.move_to_end(key)
+        # Copy one level deep so callers can't mutate the cached row or its JSON fields
+        return {k: copy.copy(v) for k, v in entry[1].items()}
+    
+    def _cache_put(self, cache: OrderedDict, key, row: Dict[str, Any]):
+        """Cache a row returned by a by-id lookup, evicting the least recently used rows past ROW_CACHE_SIZE"""
+        with self._cache_lock:
+            cache[key] = (time.monotonic(), {k: copy.copy(v) for k, v in row.items()})
+            cache.move_to_end(key)
+            while len(cache) > ROW_CACHE_SIZE:
+                cache.popitem(last=False)
+    
+    def _cache_evict(self, cache: OrderedDict, key):
+        """Drop a row from a by-id cache after it was written"""
+        with self._cache_lock:
+            cache.pop(key, None)
+    
     def init_database(self):
         """Initialize the database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            # WAL lets readers proceed while a writer commits (persists in the database file, can't run inside a transaction)
+            self._writer.execute('PRAGMA journal_mode=WAL')
+            # Truncate the -wal file back to 64 MiB after checkpoints instead of leaving it at its peak size
+            self._writer.execute('PRAGMA journal_size_limit=67108864')
+        
+        with self.session(write=True) as conn:
             cursor = conn.cursor()
             
+            cursor.execute('PRAGMA user_version')
+            schema_version = cursor.fetchone()[0]
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'datasets'")
+            is_new_database = cursor.fetchone() is None
+            
             # Create datasets table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS datasets (
@@ -41,158 +766,336 @@ class Database:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     source TEXT,
-                    metadata TEXT  -- JSON object for additional data
+                    metadata TEXT,  -- JSON object with the lightweight fields the list shows
+                    metadata_blob BLOB  -- compressed JSON object with the full metadata
                 )
             ''')
             
             # Create training_jobs table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS training_jobs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    job_type TEXT DEFAULT 'experimental',
-                    custom_capabilities TEXT,  -- JSON array of custom capabilities
-                    maker TEXT,
-                    version TEXT,
-                    base_model TEXT NOT NULL,
-                    model_name TEXT,  -- The actual model name that will be created
-                    dataset_id INTEGER,
-                    status TEXT DEFAULT 'PENDING',
-                    training_type TEXT DEFAULT 'LoRA',
-                    progress REAL DEFAULT 0.0,
-                    metrics TEXT,  -- JSON object
-                    temperature REAL DEFAULT 0.7,
-                    top_p REAL DEFAULT 0.9,
-                    context_length INTEGER DEFAULT 4096,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    started_at TIMESTAMP,
-                    completed_at TIMESTAMP,
-                    error_message TEXT,
-                    config TEXT,  -- JSON object for training configuration
-                    FOREIGN KEY (dataset_id) REFERENCES datasets (id)
-                )
-            ''')
-            
-            # Add new columns to existing table if they don't exist
-            self.migrate_training_jobs_table()
+            cursor.execute(CREATE_TRAINING_JOBS_SQL.format(table='training_jobs'))
             
             # Create evaluations table
+            cursor.execute(CREATE_EVALUATIONS_SQL.format(table='evaluations'))
+            
+            # Change counters bumped by triggers, used as cheap ETags for list endpoints
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS evaluations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    model_name TEXT NOT NULL,
-                    dataset_id INTEGER,
-                    evaluation_type TEXT DEFAULT 'accuracy',
-                    before_metrics TEXT,  -- JSON object
-                    after_metrics TEXT,   -- JSON object
-                    improvement REAL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    notes TEXT,
-                    FOREIGN KEY (dataset_id) REFERENCES datasets (id)
+                CREATE TABLE IF NOT EXISTS table_versions (
+                    name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
                 )
             ''')
+            # Fresh databases get the current schema from CREATE TABLE; older ones replay the missing migrations
+            if is_new_database:
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            elif schema_version < SCHEMA_VERSION:
+                self._run_migrations(cursor, schema_version)
+            
+            # Triggers and indexes come after the migrations, which may rebuild a table and drop its own
+            # Seed from the clock so a recreated database never reuses old version numbers
+            seed = int(datetime.now().timestamp() * 1000)
+            for table in VERSIONED_TABLES:
+                cursor.execute('INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, ?)', (table, seed))
+                for event in ('INSERT', 'UPDATE', 'DELETE'):
+                    cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                        AFTER {event} ON {table}
+                        BEGIN
+                            UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                        END
+                    ''')
+
+            # Indexes for the list endpoints' ORDER BY and status filters
+            # (datasets.dataset_id is already indexed by its UNIQUE constraint)
+            # Ascending (created_at, rowid) entries scanned backwards give ORDER BY created_at DESC, id DESC without a sort
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_datasets_created ON datasets(created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_training_jobs_created ON training_jobs(created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_training_jobs_status ON training_jobs(status)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_evaluations_created ON evaluations(created_at)')
+            # Child-side foreign key columns, probed when joining to or deleting from datasets
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_training_jobs_dataset ON training_jobs(dataset_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_evaluations_dataset ON evaluations(dataset_id)')
             
-            conn.commit()
-            print(f"✅ Database initialized at {self.db_path}")
+            # Refresh planner statistics so the new indexes get picked up
+            cursor.execute('ANALYZE')
+        print(f"✅ Database initialized at {self.db_path}")
     
-    def add_dataset(self, dataset_data: Dict[str, Any]) -> int:
-        """Add a new dataset to the database"""
-        with sqlite3.connect(self.db_path) as conn:
+    def get_table_version(self, table: str) -> int:
+        """Get the change counter for a table, bumped on every insert/update/delete"""
+        with self.session() as conn:
             cursor = conn.cursor()
-            
-            # Prepare data
-            tags_json = json.dumps(dataset_data.get('tags', []))
-            metadata_json = json.dumps(dataset_data.get('metadata', {}))
-            
-            cursor.execute('''
-                INSERT INTO datasets (
-                    name, description, dataset_id, type, sample_count, loaded_samples,
-                    size, format, license, tags, is_favorite, is_public, source, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                dataset_data.get('name'),
-                dataset_data.get('description'),
-                dataset_data.get('dataset_id'),
-                dataset_data.get('type', 'Text'),
-                dataset_data.get('sample_count', 0),
-                dataset_data.get('loaded_samples', 0),
-                dataset_data.get('size'),
-                dataset_data.get('format'),
-                dataset_data.get('license'),
-                tags_json,
-                dataset_data.get('is_favorite', False),
-                dataset_data.get('is_public', True),
-                dataset_data.get('source'),
-                metadata_json
-            ))
-            
-            dataset_id = cursor.lastrowid
-            conn.commit()
-            print(f"✅ Dataset '{dataset_data.get('name')}' added with ID {dataset_id}")
+            cursor.execute('SELECT version FROM table_versions WHERE name = ?', (table,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+    
+    def _dataset_insert_params(self, dataset_data: Dict[str, Any]) -> tuple:
+        """Build the INSERT INTO datasets parameters from dataset data"""
+        get = dataset_data.get
+        metadata = get('metadata') or {}
+        return (
+            get('name'),
+            get('description'),
+            get('dataset_id'),
+            get('type', 'Text'),
+            get('sample_count', 0),
+            get('loaded_samples', 0),
+            get('size'),
+            get('format'),
+            get('license'),
+            _encode_json_column(get('tags', [])),
+            get('is_favorite', False),
+            get('is_public', True),
+            get('source'),
+            _dumps(_light_metadata(metadata)),
+            _compress_json(metadata)
+        )
+    
+    def add_dataset(self, dataset_data: Dict[str, Any], return_row: bool = False) -> Union[int, Dict[str, Any]]:
+        """Add a new dataset to the database; return_row gives the stored dataset instead of its ID"""
+        # Encode and compress before taking the write lock
+        params = self._dataset_insert_params(dataset_data)
+        with self.session(write=True) as conn:
+            cursor = conn.cursor()
+            if return_row:
+                dataset = self._inserted_dataset(_insert_returning_row(cursor, INSERT_DATASET_SQL, params, 'datasets'), dataset_data)
+                logger.debug("✅ Dataset '%s' added with ID %s", dataset['name'], dataset['id'])
+                return dataset
+            dataset_id = _insert_returning_id(cursor, INSERT_DATASET_SQL, params)
+            logger.debug("✅ Dataset '%s' added with ID %s", dataset_data.get('name'), dataset_id)
             return dataset_id
     
-    def migrate_training_jobs_table(self):
-        """Add new columns to training_jobs table if they don't exist"""
-        with sqlite3.connect(self.db_path) as conn:
+    def _inserted_dataset(self, row: sqlite3.Row, dataset_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a row returned by an INSERT like get_dataset_by_id"""
+        dataset = dict(row)
+        del dataset['metadata_blob']
+        # Reuse the values just written instead of decoding the JSON columns again
+        dataset['tags'] = dataset_data.get('tags', [])
+        dataset['metadata'] = dataset_data.get('metadata', {})
+        # Not cached: imports can carry thousands of samples; an upsert may replace a cached row
+        self._cache_evict(self._dataset_cache, dataset['dataset_id'])
+        return dataset
+    
+    def add_datasets(self, datasets: List[Dict[str, Any]]) -> List[int]:
+        """Add several datasets in one transaction"""
+        ids = self._insert_many(INSERT_DATASET_SQL, [self._dataset_insert_params(dataset) for dataset in datasets])
+        if ids:
+            logger.debug("✅ Added %d datasets", len(ids))
+        return ids
+    
+    def add_datasets_iter(self, datasets: Iterable[Dict[str, Any]], batch_size: int = INSERT_BATCH_SIZE) -> int:
+        """Add datasets from any iterable, flushing each batch_size rows in one executemany transaction"""
+        pack = self._dataset_insert_params
+        batch = []
+        added = 0
+        for dataset in datasets:
+            batch.append(pack(dataset))
+            if len(batch) >= batch_size:
+                added += len(self._insert_many(INSERT_DATASET_SQL, batch))
+                batch.clear()
+        if batch:
+            added += len(self._insert_many(INSERT_DATASET_SQL, batch))
+        if added:
+            logger.debug("✅ Added %d datasets", added)
+        return added
+    
+    def _insert_many(self, sql: str, rows: List[tuple]) -> List[int]:
+        """Run one INSERT for many rows in a single transaction and return the new row IDs"""
+        if not rows:
+            return []
+        with self.session(write=True) as conn:
             cursor = conn.cursor()
-            
-            # Check if columns exist and add them if they don't
-            cursor.execute("PRAGMA table_info(training_jobs)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            new_columns = [
-                ('custom_capabilities', 'TEXT'),
-                ('temperature', 'REAL DEFAULT 0.7'),
-                ('top_p', 'REAL DEFAULT 0.9'),
-                ('context_length', 'INTEGER DEFAULT 4096')
-            ]
-            
-            for column_name, column_def in new_columns:
-                if column_name not in columns:
-                    try:
-                        cursor.execute(f'ALTER TABLE training_jobs ADD COLUMN {column_name} {column_def}')
-                        print(f"✅ Added column {column_name} to training_jobs table")
-                    except sqlite3.Error as e:
-                        print(f"⚠️ Could not add column {column_name}: {e}")
-            
-            conn.commit()
+            cursor.executemany(sql, rows)
+            # executemany leaves lastrowid unset; AUTOINCREMENT IDs are contiguous inside one write transaction
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            return list(range(last_id - len(rows) + 1, last_id + 1))
     
-    def get_all_datasets(self) -> List[Dict[str, Any]]:
-        """Get all datasets from the database (lightweight version for API)"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+    def insert_dataset_if_absent(self, dataset_data: Dict[str, Any]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Insert a dataset unless its dataset_id exists; returns (inserted, saved row) in one round-trip"""
+        params = self._dataset_insert_params(dataset_data)
+        with self.session(write=True) as conn:
             cursor = conn.cursor()
+            cursor.execute(INSERT_DATASET_IF_ABSENT_SQL, params)
+            row = cursor.fetchone()
             
-            cursor.execute('SELECT * FROM datasets ORDER BY created_at DESC')
-            rows = cursor.fetchall()
+            if row is None:
+                return False, None
             
-            datasets = []
+            dataset = self._inserted_dataset(row, dataset_data)
+            logger.debug("✅ Dataset '%s' added with ID %s", dataset['name'], dataset['id'])
+            return True, dataset
+    
+    def upsert_dataset(self, dataset_data: Dict[str, Any], return_row: bool = False) -> Union[int, Dict[str, Any]]:
+        """Insert a dataset or update the one with the same dataset_id in one statement; returns its ID (or row)"""
+        if not dataset_data.get('dataset_id'):
+            raise ValueError("upsert_dataset needs a dataset_id to match on")
+        params = self._dataset_insert_params(dataset_data)
+        with self.session(write=True) as conn:
+            cursor = conn.cursor()
+            if HAS_RETURNING:
+                row = cursor.execute(_returning_sql(UPSERT_DATASET_SQL, '*' if return_row else 'id'), params).fetchone()
+            else:
+                # lastrowid isn't set when the conflict branch updates, so look the row up by its key
+                cursor.execute(UPSERT_DATASET_SQL, params)
+                row = cursor.execute('SELECT * FROM datasets WHERE dataset_id = ?', (dataset_data['dataset_id'],)).fetchone()
+        if return_row:
+            return self._inserted_dataset(row, dataset_data)
+        self._cache_evict(self._dataset_cache, dataset_data['dataset_id'])
+        return row[0]
+    
+    def _run_migrations(self, cursor: sqlite3.Cursor, schema_version: int):
+        """Apply the MIGRATIONS after schema_version, recording progress in PRAGMA user_version"""
+        for version, (name, steps) in enumerate(MIGRATIONS[schema_version:], start=schema_version + 1):
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                    continue
+                try:
+                    cursor.execute(step)
+                except sqlite3.OperationalError as e:
+                    # Databases from before user_version tracking may already have some of these columns
+                    if 'duplicate column' not in str(e):
+                        raise
+            cursor.execute(f'PRAGMA user_version = {version}')
+            print(f"✅ Applied database migration {name}")
+    
+    def _update_row(self, table: str, key_column: str, key, updates: Dict[str, Any], allowed: frozenset,
+                    encoders: Dict[str, Any], touch_column: Optional[str] = None) -> bool:
+        """Apply updates to one row; values are encoded before taking the write lock"""
+        # Sorted so each set of keys maps to one cached statement
+        columns = tuple(sorted(updates))
+        if not columns:
+            return False
+        unknown = updates.keys() - allowed
+        if unknown:
+            raise ValueError(f"Cannot update {table} column(s): {', '.join(sorted(unknown))}")
+        
+        values = []
+        for column in columns:
+            encode = encoders.get(column)
+            values.extend(encode(updates[column]) if encode else (updates[column],))
+        values.append(key)
+        
+        with self.session(write=True) as conn:
+            cursor = conn.execute(_update_sql(table, columns, key_column, touch_column), values)
+            return cursor.rowcount > 0
+    
+    def _json_column_specs(self, cursor: sqlite3.Cursor, json_columns) -> Tuple[Tuple[str, ...], tuple]:
+        """Get a cursor's column names and the (index, empty type) pairs of its JSON columns"""
+        names = tuple(column[0] for column in cursor.description)
+        return names, tuple((names.index(name), empty) for name, empty in json_columns)
+    
+    def _iter_batches(self, sql: str) -> Iterator[Tuple[Tuple[str, ...], List[tuple]]]:
+        """Yield (column names, batch of tuple rows) for a list query from a pooled reader, returning it when done"""
+        # A stream can stay open for a while, so use a throwaway connection rather than wait for a busy pool
+        conn = self._acquire_reader(block=False)
+        release = self._readers.put
+        if conn is None:
+            conn = self._connect(readonly=True)
+            release = sqlite3.Connection.close
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        try:
+            cursor.execute(sql)
+            names = tuple(column[0] for column in cursor.description)
+            while True:
+                rows = cursor.fetchmany(ROW_BATCH_SIZE)
+                if not rows:
+                    break
+                yield names, rows
+        finally:
+            cursor.close()
+            release(conn)
+    
+    def _iter_query(self, sql: str, json_columns, finish=None) -> Iterator[Dict[str, Any]]:
+        """Yield decoded rows of a list query in batches"""
+        specs = None
+        for names, rows in self._iter_batches(sql):
+            if specs is None:
+                # Resolve the JSON column positions once per query, not per batch
+                specs = tuple((names.index(name), empty) for name, empty in json_columns)
+            for item in rows_to_dicts(rows, names, specs, _loads):
+                yield finish(item) if finish else item
+    
+    def _iter_query_json(self, sql: str, raw_columns) -> Iterator[bytes]:
+        """Yield each row of a list query as JSON bytes, with its JSON columns spliced in as stored"""
+        layout = None
+        for names, rows in self._iter_batches(sql):
+            if layout is None:
+                layout = _row_json_layout(names, raw_columns)
+            plain, spliced = layout
             for row in rows:
-                dataset = dict(row)
-                # Parse JSON fields
-                dataset['tags'] = json.loads(dataset['tags']) if dataset['tags'] else []
-                
-                # Parse metadata but remove heavy fields for API response
-                metadata = json.loads(dataset['metadata']) if dataset['metadata'] else {}
-                
-                # Keep only essential metadata fields
-                lightweight_metadata = {
-                    'loaded_at': metadata.get('loaded_at'),
-                    'split_used': metadata.get('split_used'),
-                    'format_analysis': metadata.get('format_analysis'),  # Include format analysis!
-                    'samples_preview': metadata.get('samples_preview', [])[:5]  # Only first 5 samples for preview
-                }
-                
-                dataset['metadata'] = lightweight_metadata
-                datasets.append(dataset)
-            
-            return datasets
+                yield _row_json(row, plain, spliced)
+    
+    def _finish_dataset_row(self, dataset: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild the lightweight metadata from the columns DATASET_LIST_COLUMNS extracted"""
+        dataset['metadata'] = {
+            'loaded_at': dataset.pop('loaded_at'),
+            'split_used': dataset.pop('split_used'),
+            'format_analysis': dataset.pop('format_analysis_json'),
+            'samples_preview': (dataset.pop('samples_preview_json') or [])[:5]
+        }
+        return dataset
+    
+    def iter_datasets(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all datasets (lightweight version for API) without materializing the list"""
+        return self._iter_query(LIST_DATASETS_SQL, DATASET_JSON_COLUMNS, self._finish_dataset_row)
+    
+    def iter_datasets_json(self) -> Iterator[bytes]:
+        """Iterate over all datasets as JSON bytes, shaped like iter_datasets but never parsing the JSON columns"""
+        return self._iter_query_json(LIST_DATASETS_JSON_SQL, DATASET_RAW_JSON_COLUMNS)
+    
+    def _fetch_lazy_rows(self, sql: str, json_columns, computed=None, hidden=(), params=()) -> List[LazyRow]:
+        """Run a list query and wrap each tuple row in a LazyRow"""
+        with self.session() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(sql, params)
+            names = tuple(column[0] for column in cursor.description)
+            layout = RowLayout(names, json_columns, computed, hidden)
+            return [LazyRow(row, layout) for row in cursor.fetchall()]
+    
+    def _cached_lazy_rows(self, table: str, sql: str, json_columns, computed=None, hidden=()) -> List[LazyRow]:
+        """Like _fetch_lazy_rows, but reuse the fetched rows until the table's version changes"""
+        # Read the version before the rows, so a concurrent write can only make the cached rows newer than their tag
+        version = self.get_table_version(table)
+        with self._cache_lock:
+            cached = self._list_cache.get(sql)
+        if cached is None or cached[0] != version:
+            with self.session() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                cursor.execute(sql)
+                layout = RowLayout(tuple(column[0] for column in cursor.description), json_columns, computed, hidden)
+                cached = (version, layout, cursor.fetchall())
+            with self._cache_lock:
+                self._list_cache[sql] = cached
+        # Fresh LazyRows per call, so callers can still change their rows without touching the cache
+        _, layout, rows = cached
+        return [LazyRow(row, layout) for row in rows]
+    
+    def get_all_datasets(self, limit: Optional[int] = None, before: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        """Get datasets newest first (lightweight version; JSON fields are parsed on first access)"""
+        # limit/before page through them: before is the (created_at, id) of the last row already seen
+        if limit is None and before is None:
+            return self._cached_lazy_rows(
+                'datasets', LIST_DATASETS_SQL, (('tags', list),), {'metadata': _dataset_list_metadata}, DATASET_LIST_HIDDEN)
+        sql, params = _page_query(FIRST_PAGE_DATASETS_SQL, NEXT_PAGE_DATASETS_SQL, limit, before)
+        return self._fetch_lazy_rows(
+            sql, (('tags', list),), {'metadata': _dataset_list_metadata}, DATASET_LIST_HIDDEN, params=params)
+    
+    def get_dataset_summary(self, dataset_pk: int) -> Optional[Dict[str, Any]]:
+        """Get one dataset by its row ID, shaped like an entry of get_all_datasets"""
+        rows = self._fetch_lazy_rows(
+            DATASET_SUMMARY_SQL, (('tags', list),), {'metadata': _dataset_list_metadata}, DATASET_LIST_HIDDEN,
+            params=(dataset_pk,))
+        return rows[0] if rows else None
     
     def get_dataset_by_id(self, dataset_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific dataset by its Hugging Face ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        cached = self._cache_get(self._dataset_cache, dataset_id)
+        if cached is not None:
+            return cached
+        
+        with self.session() as conn:
             cursor = conn.cursor()
             
             cursor.execute('SELECT * FROM datasets WHERE dataset_id = ?', (dataset_id,))
@@ -200,121 +1103,118 @@ class Database:
             
             if row:
                 dataset = dict(row)
-                dataset['tags'] = json.loads(dataset['tags']) if dataset['tags'] else []
-                dataset['metadata'] = json.loads(dataset['metadata']) if dataset['metadata'] else {}
+                blob = dataset.pop('metadata_blob')
+                dataset['tags'] = _loads(dataset['tags']) if dataset['tags'] else []
+                if blob:
+                    dataset['metadata'] = _decompress_json(blob)
+                else:
+                    dataset['metadata'] = _loads(dataset['metadata']) if dataset['metadata'] else {}
+                # Rows carrying the full sample list stay out of the cache to keep it small
+                if 'all_samples' not in dataset['metadata']:
+                    self._cache_put(self._dataset_cache, dataset_id, dataset)
                 return dataset
             
             return None
     
     def update_dataset(self, dataset_id: str, updates: Dict[str, Any]) -> bool:
         """Update a dataset"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Prepare update fields
-            update_fields = []
-            values = []
-            
-            for key, value in updates.items():
-                if key == 'tags':
-                    update_fields.append(f"{key} = ?")
-                    values.append(json.dumps(value))
-                elif key == 'metadata':
-                    update_fields.append(f"{key} = ?")
-                    values.append(json.dumps(value))
-                else:
-                    update_fields.append(f"{key} = ?")
-                    values.append(value)
-            
-            if not update_fields:
-                return False
-            
-            update_fields.append("last_modified = CURRENT_TIMESTAMP")
-            values.append(dataset_id)
-            
-            query = f"UPDATE datasets SET {', '.join(update_fields)} WHERE dataset_id = ?"
-            cursor.execute(query, values)
-            
-            conn.commit()
-            return cursor.rowcount > 0
+        updated = self._update_row('datasets', 'dataset_id', dataset_id, updates, DATASET_UPDATABLE_COLUMNS,
+                                   DATASET_UPDATE_ENCODERS, 'last_modified')
+        self._cache_evict(self._dataset_cache, dataset_id)
+        return updated
     
     def delete_dataset(self, dataset_id: str) -> bool:
         """Delete a dataset"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.session(write=True) as conn:
             cursor = conn.cursor()
+            # The foreign keys remove the dataset's evaluations and detach its training jobs in the same statement
             cursor.execute('DELETE FROM datasets WHERE dataset_id = ?', (dataset_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+        self._cache_evict(self._dataset_cache, dataset_id)
+        if cursor.rowcount > 0:
+            # Cached jobs may still carry the old dataset_id
+            with self._cache_lock:
+                self._job_cache.clear()
+        return cursor.rowcount > 0
     
     def toggle_favorite(self, dataset_id: str) -> bool:
         """Toggle favorite status of a dataset"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.session(write=True) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE datasets 
                 SET is_favorite = NOT is_favorite, last_modified = CURRENT_TIMESTAMP 
                 WHERE dataset_id = ?
             ''', (dataset_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+        self._cache_evict(self._dataset_cache, dataset_id)
+        return cursor.rowcount > 0
     
-    def add_training_job(self, job_data: Dict[str, Any]) -> int:
-        """Add a new training job"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            metrics_json = json.dumps(job_data.get('metrics', {}))
-            config_json = json.dumps(job_data.get('config', {}))
-            
-            # Handle custom capabilities
-            custom_capabilities_json = json.dumps(job_data.get('custom_capabilities', []))
-            
-            cursor.execute('''
-                INSERT INTO training_jobs (
-                    name, description, job_type, custom_capabilities, maker, version, base_model, model_name,
-                    dataset_id, status, training_type, progress, metrics, config, temperature, top_p, context_length
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job_data.get('name'),
-                job_data.get('description', ''),
-                job_data.get('job_type', 'experimental'),
-                custom_capabilities_json,
-                job_data.get('maker', ''),
-                job_data.get('version', ''),
-                job_data.get('base_model'),
-                job_data.get('model_name'),
-                job_data.get('dataset_id'),
-                job_data.get('status', 'PENDING'),
-                job_data.get('training_type', 'LoRA'),
-                job_data.get('progress', 0.0),
-                metrics_json,
-                config_json,
-                job_data.get('temperature', 0.7),
-                job_data.get('top_p', 0.9),
-                job_data.get('context_length', 4096)
-            ))
-            
-            job_id = cursor.lastrowid
-            conn.commit()
-            return job_id
-    
-    def get_training_jobs(self) -> List[Dict[str, Any]]:
-        """Get all training jobs"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+    def _training_job_insert_params(self, job_data: Dict[str, Any]) -> tuple:
+        """Build the INSERT INTO training_jobs parameters from job data"""
+        metrics_json = _encode_json_column(job_data.get('metrics', {}))
+        # Config may arrive as a JSON string (the raw request body); store it as-is instead of encoding it again
+        config = job_data.get('config', {})
+        config_json = config if isinstance(config, str) else _encode_json_column(config)
+        
+        # Handle custom capabilities
+        custom_capabilities_json = _dumps(job_data.get('custom_capabilities', []))
+        
+        return (
+            job_data.get('name'),
+            job_data.get('description', ''),
+            job_data.get('job_type', 'experimental'),
+            custom_capabilities_json,
+            job_data.get('maker', ''),
+            job_data.get('version', ''),
+            job_data.get('base_model'),
+            job_data.get('model_name'),
+            job_data.get('dataset_id'),
+            job_data.get('status', 'PENDING'),
+            job_data.get('training_type', 'LoRA'),
+            job_data.get('progress', 0.0),
+            metrics_json,
+            config_json,
+            job_data.get('temperature', 0.7),
+            job_data.get('top_p', 0.9),
+            job_data.get('context_length', 4096)
+        )
+    
+    def add_training_job(self, job_data: Dict[str, Any], return_row: bool = False) -> Union[int, Dict[str, Any]]:
+        """Add a new training job; return_row gives the stored job instead of its ID"""
+        # Encode before taking the write lock
+        params = self._training_job_insert_params(job_data)
+        with self.session(write=True) as conn:
             cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM training_jobs ORDER BY created_at DESC')
-            rows = cursor.fetchall()
-            
-            jobs = []
-            for row in rows:
-                job = dict(row)
-                job['metrics'] = json.loads(job['metrics']) if job['metrics'] else {}
-                job['config'] = json.loads(job['config']) if job['config'] else {}
-                jobs.append(job)
-            
-            return jobs
+            if not return_row:
+                return _insert_returning_id(cursor, INSERT_TRAINING_JOB_SQL, params)
+            row = _insert_returning_row(cursor, INSERT_TRAINING_JOB_SQL, params, 'training_jobs')
+        job = _decode_row(row, TRAINING_JOB_JSON_COLUMNS)
+        self._cache_put(self._job_cache, str(job['id']), job)
+        return job
+    
+    def add_training_jobs(self, jobs: List[Dict[str, Any]]) -> List[int]:
+        """Add several training jobs in one transaction"""
+        return self._insert_many(INSERT_TRAINING_JOB_SQL, [self._training_job_insert_params(job) for job in jobs])
+    
+    def iter_training_jobs(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all training jobs without materializing the list"""
+        return self._iter_query(LIST_TRAINING_JOBS_SQL, TRAINING_JOB_JSON_COLUMNS)
+    
+    def iter_training_jobs_json(self) -> Iterator[bytes]:
+        """Iterate over all training jobs as JSON bytes without parsing metrics/config"""
+        return self._iter_query_json(LIST_TRAINING_JOBS_SQL, TRAINING_JOB_RAW_JSON_COLUMNS)
+    
+    def get_training_jobs(self, limit: Optional[int] = None, before: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        """Get training jobs newest first (metrics and config are parsed on first access); pages like get_all_datasets"""
+        if limit is None and before is None:
+            return self._cached_lazy_rows('training_jobs', LIST_TRAINING_JOBS_SQL, TRAINING_JOB_JSON_COLUMNS)
+        sql, params = _page_query(FIRST_PAGE_TRAINING_JOBS_SQL, NEXT_PAGE_TRAINING_JOBS_SQL, limit, before)
+        return self._fetch_lazy_rows(sql, TRAINING_JOB_JSON_COLUMNS, params=params)
+    
+    def get_training_jobs_with_datasets(self) -> List[Dict[str, Any]]:
+        """Get all training jobs with their dataset summary under 'dataset' (None if missing), in one query"""
+        return self._fetch_lazy_rows(
+            LIST_TRAINING_JOBS_WITH_DATASETS_SQL, TRAINING_JOB_JSON_COLUMNS, {'dataset': _joined_dataset},
+            tuple(JOINED_DATASET_COLUMNS.values()))
     
     def get_all_training_jobs(self) -> List[Dict[str, Any]]:
         """Get all training jobs (alias for get_training_jobs)"""
@@ -322,8 +1222,11 @@ class Database:
     
     def get_training_job_by_id(self, job_id: int) -> Optional[Dict[str, Any]]:
         """Get a training job by ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        cached = self._cache_get(self._job_cache, str(job_id))
+        if cached is not None:
+            return cached
+        
+        with self.session() as conn:
             cursor = conn.cursor()
             
             cursor.execute('SELECT * FROM training_jobs WHERE id = ?', (job_id,))
@@ -331,223 +1234,252 @@ class Database:
             
             if row:
                 job = dict(row)
-                job['metrics'] = json.loads(job['metrics']) if job['metrics'] else {}
-                job['config'] = json.loads(job['config']) if job['config'] else {}
+                job['metrics'] = _loads(job['metrics']) if job['metrics'] else {}
+                job['config'] = _loads(job['config']) if job['config'] else {}
+                self._cache_put(self._job_cache, str(job_id), job)
                 return job
             
             return None
     
+    def get_training_job_statuses(self, job_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get status and progress for several training jobs in one query"""
+        if not job_ids:
+            return {}
+        with self.session() as conn:
+            cursor = conn.cursor()
+            # Columns are read by position, so skip building sqlite3.Row objects
+            cursor.row_factory = None
+            placeholders = ','.join('?' * len(job_ids))
+            cursor.execute(f'SELECT id, status, progress FROM training_jobs WHERE id IN ({placeholders})', list(job_ids))
+            return {row[0]: {'status': row[1], 'progress': row[2]} for row in cursor.fetchall()}
+    
     def get_training_job(self, job_id: int) -> Optional[Dict[str, Any]]:
         """Get a training job by ID (alias for get_training_job_by_id)"""
         return self.get_training_job_by_id(job_id)
     
     def update_training_job(self, job_id: int, updates: Dict[str, Any]) -> bool:
         """Update a training job"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Prepare update fields
-            update_fields = []
-            values = []
-            
-            for key, value in updates.items():
-                if key in ['metrics', 'config']:
-                    update_fields.append(f"{key} = ?")
-                    values.append(json.dumps(value) if isinstance(value, (dict, list)) else value)
-                else:
-                    update_fields.append(f"{key} = ?")
-                    values.append(value)
-            
-            if not update_fields:
-                return False
-            
-            values.append(job_id)
-            query = f"UPDATE training_jobs SET {', '.join(update_fields)} WHERE id = ?"
-            
-            cursor.execute(query, values)
-            conn.commit()
-            
-            # Check if training job was marked as COMPLETED and create automatic evaluation
-            if 'status' in updates and updates['status'] == 'COMPLETED':
-                self._create_automatic_evaluation(job_id)
-            
-            return cursor.rowcount > 0
+        updated = self._update_row('training_jobs', 'id', job_id, updates, TRAINING_JOB_UPDATABLE_COLUMNS,
+                                   TRAINING_JOB_UPDATE_ENCODERS)
+        self._cache_evict(self._job_cache, str(job_id))
+        
+        # Check if training job was marked as COMPLETED and create automatic evaluation in the background
+        if 'status' in updates and updates['status'] == 'COMPLETED':
+            self._eval_executor.submit(self._create_automatic_evaluation, job_id)
+        
+        return updated
+    
+    def update_job_progress(self, job_id: int, progress: float, status: Optional[str] = None) -> bool:
+        """Update a training job's progress (and optionally status) with one static statement"""
+        with self.session(write=True) as conn:
+            updated = conn.execute(UPDATE_JOB_PROGRESS_SQL, (progress, status, job_id)).rowcount > 0
+        self._cache_evict(self._job_cache, str(job_id))
+        if status == 'COMPLETED':
+            self._eval_executor.submit(self._create_automatic_evaluation, job_id)
+        return updated
+    
+    def update_training_job_metrics(self, job_id: int, patch: Dict[str, Any]) -> bool:
+        """Merge patch into a training job's metrics with json_patch, without reading the stored metrics"""
+        patch_json = _dumps(patch)
+        with self.session(write=True) as conn:
+            updated = conn.execute(PATCH_JOB_METRICS_SQL, (patch_json, job_id)).rowcount > 0
+        self._cache_evict(self._job_cache, str(job_id))
+        return updated
+    
+    def update_jobs_progress(self, rows: List[Tuple[float, str, int]]) -> int:
+        """Write (progress, metrics patch JSON, job_id) rows for running jobs in one transaction"""
+        with self.session(write=True) as conn:
+            conn.executemany(FLUSH_JOB_PROGRESS_SQL, rows)
+        for _, _, job_id in rows:
+            self._cache_evict(self._job_cache, str(job_id))
+        return len(rows)
     
     def delete_training_job(self, job_id: int) -> bool:
         """Delete a training job"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.session(write=True) as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM training_jobs WHERE id = ?", (job_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+        self._cache_evict(self._job_cache, str(job_id))
+        return cursor.rowcount > 0
+    
+    def _evaluation_insert_params(self, eval_data: Dict[str, Any]) -> tuple:
+        """Build the INSERT_EVALUATION_SQL parameters for one evaluation"""
+        return (
+            eval_data.get('model_name'),
+            eval_data.get('dataset_id'),
+            eval_data.get('evaluation_type', 'accuracy'),
+            _encode_json_column(eval_data.get('before_metrics', {})),
+            _encode_json_column(eval_data.get('after_metrics', {})),
+            eval_data.get('improvement'),
+            eval_data.get('notes')
+        )
     
-    def add_evaluation(self, eval_data: Dict[str, Any]) -> int:
-        """Add a new evaluation"""
-        with sqlite3.connect(self.db_path) as conn:
+    def add_evaluation(self, eval_data: Dict[str, Any], return_row: bool = False) -> Union[int, Dict[str, Any]]:
+        """Add a new evaluation; return_row gives the stored evaluation instead of its ID"""
+        # Encode before taking the write lock
+        params = self._evaluation_insert_params(eval_data)
+        with self.session(write=True) as conn:
             cursor = conn.cursor()
-            
-            before_metrics_json = json.dumps(eval_data.get('before_metrics', {}))
-            after_metrics_json = json.dumps(eval_data.get('after_metrics', {}))
-            
-            cursor.execute('''
-                INSERT INTO evaluations (
-                    model_name, dataset_id, evaluation_type, before_metrics,
-                    after_metrics, improvement, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                eval_data.get('model_name'),
-                eval_data.get('dataset_id'),
-                eval_data.get('evaluation_type', 'accuracy'),
-                before_metrics_json,
-                after_metrics_json,
-                eval_data.get('improvement'),
-                eval_data.get('notes')
-            ))
-            
-            eval_id = cursor.lastrowid
-            conn.commit()
-            return eval_id
+            if not return_row:
+                return _insert_returning_id(cursor, INSERT_EVALUATION_SQL, params)
+            row = _insert_returning_row(cursor, INSERT_EVALUATION_SQL, params, 'evaluations')
+        return _decode_row(row, EVALUATION_JSON_COLUMNS)
+    
+    def add_evaluations(self, evaluations: List[Dict[str, Any]]) -> List[int]:
+        """Add several evaluations in one transaction"""
+        return self._insert_many(INSERT_EVALUATION_SQL, [self._evaluation_insert_params(evaluation) for evaluation in evaluations])
     
     def get_evaluations(self) -> List[Dict[str, Any]]:
         """Get all evaluations"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.session() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
             
-            cursor.execute('SELECT * FROM evaluations ORDER BY created_at DESC')
-            rows = cursor.fetchall()
-            
-            evaluations = []
-            for row in rows:
-                eval_data = dict(row)
-                eval_data['before_metrics'] = json.loads(eval_data['before_metrics']) if eval_data['before_metrics'] else {}
-                eval_data['after_metrics'] = json.loads(eval_data['after_metrics']) if eval_data['after_metrics'] else {}
-                evaluations.append(eval_data)
+            cursor.execute(LIST_EVALUATIONS_SQL)
+            names, specs = self._json_column_specs(cursor, EVALUATION_JSON_COLUMNS)
+            return rows_to_dicts(cursor.fetchall(), names, specs, _loads)
+    
+    def get_evaluations_json(self) -> List[bytes]:
+        """Get all evaluations as JSON bytes without parsing before/after_metrics"""
+        with self.session() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
             
-            return evaluations
+            cursor.execute(LIST_EVALUATIONS_SQL)
+            plain, spliced = _row_json_layout(tuple(column[0] for column in cursor.description), EVALUATION_RAW_JSON_COLUMNS)
+            return [_row_json(row, plain, spliced) for row in cursor.fetchall()]
     
     def update_evaluation(self, eval_id: int, updates: Dict[str, Any]) -> bool:
         """Update an evaluation"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Prepare update fields
-            update_fields = []
-            values = []
-            
-            for key, value in updates.items():
-                if key in ['before_metrics', 'after_metrics']:
-                    update_fields.append(f"{key} = ?")
-                    values.append(json.dumps(value))
-                else:
-                    update_fields.append(f"{key} = ?")
-                    values.append(value)
-            
-            if not update_fields:
-                return False
-            
-            update_fields.append("updated_at = CURRENT_TIMESTAMP")
-            values.append(eval_id)
-            
-            query = f"UPDATE evaluations SET {', '.join(update_fields)} WHERE id = ?"
-            cursor.execute(query, values)
-            conn.commit()
-            
-            return cursor.rowcount > 0
+        return self._update_row('evaluations', 'id', eval_id, updates, EVALUATION_UPDATABLE_COLUMNS,
+                                EVALUATION_UPDATE_ENCODERS, 'updated_at')
+    
+    def _ollama_list(self) -> str:
+        """Get `ollama list` output, reusing it for OLLAMA_LIST_TTL seconds"""
+        now = time.monotonic()
+        fetched_at, output = self._ollama_cache
+        if now - fetched_at < OLLAMA_LIST_TTL:
+            return output
+        output = subprocess.run(['ollama', 'list'], capture_output=True, text=True, timeout=5).stdout
+        self._ollama_cache = (now, output)
+        return output
     
     def _create_automatic_evaluation(self, job_id: int):
         """Create automatic evaluation when training job completes"""
         try:
-            # Get the completed training job
-            job = self.get_training_job_by_id(job_id)
-            if not job:
-                print(f"❌ Could not find training job {job_id} for automatic evaluation")
-                return
-            
-            model_name = job.get('model_name')
-            if not model_name:
-                print(f"❌ Training job {job_id} has no model_name for evaluation")
-                return
-            
-            # Get the actual Ollama model name from the training job
-            actual_model_name = job.get('actual_model_name')
-            if not actual_model_name:
-                # Fallback: convert model name to actual Ollama model name (replace version with :latest)
-                if ':' in model_name:
-                    base_name = model_name.split(':')[0]
-                    actual_model_name = f"{base_name}:latest"
-                else:
-                    actual_model_name = model_name
-                print(f"⚠️ No actual_model_name found, using fallback: {model_name} -> {actual_model_name}")
-            else:
-                print(f"✅ Using stored actual model name: {actual_model_name}")
-            
-            # Verify the model exists in Ollama
+            # Fetch `ollama list` up front so no subprocess runs while the write lock is held
             try:
-                import subprocess
-                result = subprocess.run(['ollama', 'list'], capture_output=True, text=True, timeout=5)
-                if actual_model_name not in result.stdout:
-                    print(f"⚠️ Model {actual_model_name} not found in Ollama, using fallback")
-                    if ':' in model_name:
-                        base_name = model_name.split(':')[0]
-                        actual_model_name = f"{base_name}:latest"
-                    else:
-                        actual_model_name = model_name
+                ollama_models = self._ollama_list()
             except:
-                print(f"⚠️ Could not verify model existence, using {actual_model_name}")
-            
-            # Parse config to get dataset information
-            config = {}
-            if job.get('config'):
-                try:
-                    config = json.loads(job['config']) if isinstance(job['config'], str) else job['config']
-                except:
-                    config = {}
-            
-            # Get the first selected dataset for evaluation
-            selected_datasets = config.get('selectedDatasets', [])
-            if not selected_datasets:
-                print(f"❌ Training job {job_id} has no selected datasets for evaluation")
-                return
+                ollama_models = None
             
-            dataset_id = selected_datasets[0]  # Use first dataset
-            
-            # Get base model from training job config
-            base_model = config.get('baseModel', 'llama3.2:latest')
-            
-            # Create evaluation data
-            eval_data = {
-                'model_name': actual_model_name,  # Use actual Ollama model name
-                'base_model': base_model,  # Base model for before/after comparison
-                'dataset_id': dataset_id,
-                'evaluation_type': 'accuracy',
-                'notes': f'Automatic evaluation after {job.get("training_type", "training")} completion'
-            }
-            
-            # Add evaluation to database
-            eval_id = self.add_evaluation(eval_data)
-            print(f"✅ Created automatic evaluation {eval_id} for model {model_name}")
+            # Read the job and insert its evaluation in a single transaction
+            with self.session(write=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT * FROM training_jobs WHERE id = ?', (job_id,))
+                row = cursor.fetchone()
+                if not row:
+                    logger.error("❌ Could not find training job %s for automatic evaluation", job_id)
+                    return
+                
+                job = dict(row)
+                model_name = job.get('model_name')
+                if not model_name:
+                    logger.error("❌ Training job %s has no model_name for evaluation", job_id)
+                    return
+                
+                # Fallback: convert model name to actual Ollama model name (replace version with :latest)
+                fallback_name = f"{model_name.split(':')[0]}:latest" if ':' in model_name else model_name
+                
+                # Get the actual Ollama model name from the training job
+                actual_model_name = job.get('actual_model_name')
+                if not actual_model_name:
+                    actual_model_name = fallback_name
+                    logger.warning("⚠️ No actual_model_name found, using fallback: %s -> %s", model_name, actual_model_name)
+                else:
+                    logger.debug("✅ Using stored actual model name: %s", actual_model_name)
+                
+                # Verify the model exists in Ollama
+                if ollama_models is None:
+                    logger.warning("⚠️ Could not verify model existence, using %s", actual_model_name)
+                elif actual_model_name not in ollama_models:
+                    logger.warning("⚠️ Model %s not found in Ollama, using fallback", actual_model_name)
+                    actual_model_name = fallback_name
+                
+                # Parse config to get dataset information
+                config = {}
+                if job.get('config'):
+                    try:
+                        config = _loads(job['config'])
+                    except:
+                        config = {}
+                
+                # Get the first selected dataset for evaluation
+                selected_datasets = config.get('selectedDatasets', [])
+                if not selected_datasets:
+                    logger.error("❌ Training job %s has no selected datasets for evaluation", job_id)
+                    return
+                
+                dataset_id = selected_datasets[0]  # Use first dataset
+                
+                # Get base model from training job config
+                base_model = config.get('baseModel', 'llama3.2:latest')
+                
+                # Create evaluation data
+                eval_data = {
+                    'model_name': actual_model_name,  # Use actual Ollama model name
+                    'base_model': base_model,  # Base model for before/after comparison
+                    'dataset_id': dataset_id,
+                    'evaluation_type': 'accuracy',
+                    'notes': f'Automatic evaluation after {job.get("training_type", "training")} completion'
+                }
+                
+                # Add evaluation to database (joins this transaction)
+                eval_id = self.add_evaluation(eval_data)
+            logger.debug("✅ Created automatic evaluation %s for model %s", eval_id, model_name)
             
             # Start the evaluation
             try:
                 from evaluation_executor import evaluation_executor
                 success = evaluation_executor.start_evaluation(eval_id, eval_data)
                 if success:
-                    print(f"🚀 Started automatic evaluation {eval_id} for {model_name}")
+                    logger.debug("🚀 Started automatic evaluation %s for %s", eval_id, model_name)
                 else:
-                    print(f"❌ Failed to start automatic evaluation {eval_id}")
+                    logger.error("❌ Failed to start automatic evaluation %s", eval_id)
             except Exception as e:
-                print(f"❌ Error starting automatic evaluation {eval_id}: {e}")
+                logger.error("❌ Error starting automatic evaluation %s: %s", eval_id, e)
                 
         except Exception as e:
-            print(f"❌ Error creating automatic evaluation for job {job_id}: {e}")
+            logger.error("❌ Error creating automatic evaluation for job %s: %s", job_id, e)
+
+# Global database instance, created on first use so importing this module doesn't open the file or create tables
+_db = None
+_db_lock = threading.Lock()
+
+def get_db() -> Database:
+    """Get the shared Database, creating it on the first call"""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = Database()
+    return _db
+
+def close_db():
+    """Close the shared Database's connections if it was ever opened"""
+    if _db is not None:
+        _db.close()
 
-# Global database instance
-db = Database()
+def __getattr__(name: str):
+    """Resolve `db` (including `from database import db`) to the lazily created shared Database"""
+    if name == 'db':
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
     # Test the database
     print("Testing database...")
+    db = get_db()
     
     # Add a test dataset
     test_dataset = {
@@ -4,69 +4,163 @@ Dataset Loader for AI Refinement Dashboard
 Loads Hugging Face datasets and makes them available via API
 """
 
+import ast
 import json
 from datasets import load_dataset
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import argparse
+import functools
+import hashlib
+import mmap
 import os
 import time
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # zlib keeps the cache working without the optional dependency
+    zstandard = None
+
+# On-disk cache of Hugging Face loads so retries and double submits skip the download
+CACHE_DIR = os.environ.get('AI_REPUBLIC_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'ai-republic', 'hf'))
+CACHE_TTL = 24 * 60 * 60  # seconds
+CACHE_VERSION = 1
+# Opened datasets kept per process; full loads are memory-mapped Arrow files, so entries are cheap to hold
+DATASET_HANDLE_CACHE_SIZE = 32
+
+@functools.lru_cache(maxsize=DATASET_HANDLE_CACHE_SIZE)
+def _cached_load(dataset_id: str, streaming: bool = False):
+    """Open a Hugging Face dataset once per process; least recently used handles are dropped past the limit"""
+    return load_dataset(dataset_id, streaming=streaming)
+
+def clear_dataset_cache():
+    """Forget the opened dataset handles so the next load resolves the dataset again"""
+    _cached_load.cache_clear()
+
+# Loads of up to this many samples stream just those rows instead of downloading the whole dataset
+STREAMING_MAX_SAMPLES = 10_000
+
+def _stream_rows(dataset_id: str, count: int) -> Optional[Tuple[str, Dict[str, List[Any]], int, int]]:
+    """Stream the first count rows of the train (or first) split as columns; returns (split, columns, rows, bytes) or None"""
+    try:
+        streamed = _cached_load(dataset_id, streaming=True)
+        split_name = 'train' if 'train' in streamed else list(streamed.keys())[0]
+        split = streamed[split_name]
+        # The row count comes from the dataset's metadata; without it the caller falls back to a full download
+        splits = split.info.splits
+        split_info = splits[split_name] if splits and split_name in splits else None
+        total_samples = split_info.num_examples if split_info else 0
+        if not total_samples:
+            return None
+        rows = list(split.take(min(count, total_samples)))
+    except Exception as e:
+        print(f"⚠️ Streaming {dataset_id} failed, downloading it instead: {e}")
+        return None
+    
+    columns = list(rows[0]) if rows else []
+    return split_name, {name: [row.get(name) for row in rows] for name in columns}, total_samples, split_info.num_bytes or 0
 
 def load_python_dataset() -> Dict[str, Any]:
     """Load the Python code dataset from Hugging Face"""
     print("Loading Python code dataset...")
-    ds = load_dataset('jtatman/python-code-dataset-500k')
-    
-    # Get sample data
-    sample_data = []
-    for i in range(min(100, len(ds['train']))):  # Get first 100 samples
-        sample = ds['train'][i]
-        sample_data.append({
+    # Stream the 100 preview rows rather than downloading all 500k
+    streamed = _stream_rows('jtatman/python-code-dataset-500k', 100)
+    if streamed is not None:
+        _, batch, total_samples, _ = streamed
+    else:
+        ds = _cached_load('jtatman/python-code-dataset-500k')
+        total_samples = len(ds['train'])
+        # One slice converts each column of the first 100 rows at once
+        batch = ds['train'][:100]
+    count = len(next(iter(batch.values()), []))
+    blank = [''] * count
+    source = 'Hugging Face - jtatman/python-code-dataset-500k'
+    sample_data = [
+        {
             'id': f'python-{i}',
-            'instruction': sample.get('instruction', ''),
-            'output': sample.get('output', ''),
-            'system': sample.get('system', ''),
+            'instruction': instruction,
+            'output': output,
+            'system': system,
             'type': 'Python Code',
-            'source': 'Hugging Face - jtatman/python-code-dataset-500k'
-        })
+            'source': source
+        }
+        for i, (instruction, output, system) in enumerate(zip(
+            batch.get('instruction', blank), batch.get('output', blank), batch.get('system', blank)))
+    ]
     
     return {
         'name': 'Python Code Dataset',
         'description': 'Python code snippets with instructions and outputs',
-        'total_samples': len(ds['train']),
+        'total_samples': total_samples,
         'samples': sample_data,
         'format': 'JSONL',
-        'size': f'{len(ds["train"]):,} samples'
+        'size': f'{total_samples:,} samples'
     }
 
 def load_javascript_dataset() -> Dict[str, Any]:
     """Load a JavaScript dataset (if available)"""
     try:
         print("Loading JavaScript dataset...")
-        ds = load_dataset('axay/javascript-dataset')
-        
-        sample_data = []
-        for i in range(min(100, len(ds['train']))):
-            sample = ds['train'][i]
-            sample_data.append({
+        streamed = _stream_rows('axay/javascript-dataset', 100)
+        if streamed is not None:
+            _, batch, total_samples, _ = streamed
+        else:
+            ds = _cached_load('axay/javascript-dataset')
+            total_samples = len(ds['train'])
+            batch = ds['train'][:100]
+        count = len(next(iter(batch.values()), []))
+        blank = [''] * count
+        source = 'Hugging Face - axay/javascript-dataset'
+        sample_data = [
+            {
                 'id': f'js-{i}',
-                'code': sample.get('code', ''),
-                'description': sample.get('description', ''),
+                'code': code,
+                'description': description,
                 'type': 'JavaScript Code',
-                'source': 'Hugging Face - axay/javascript-dataset'
-            })
+                'source': source
+            }
+            for i, (code, description) in enumerate(zip(batch.get('code', blank), batch.get('description', blank)))
+        ]
         
         return {
             'name': 'JavaScript Dataset',
             'description': 'JavaScript code snippets',
-            'total_samples': len(ds['train']),
+            'total_samples': total_samples,
             'samples': sample_data,
             'format': 'JSONL',
-            'size': f'{len(ds["train"]):,} samples'
+            'size': f'{total_samples:,} samples'
         }
     except Exception as e:
         print(f"JavaScript dataset not available: {e}")
         return None
 
+# Columns tried in order for a Hugging Face sample's instruction and output
+INSTRUCTION_FIELDS = ('instruction', 'input', 'prompt', 'question', 'text')
+OUTPUT_FIELDS = ('output', 'target', 'answer', 'response', 'code', 'solution')
+# Fallback fields tried in order when converting samples of an unknown format
+UNKNOWN_INSTRUCTION_FIELDS = ('text', 'input', 'prompt', 'question')
+UNKNOWN_OUTPUT_FIELDS = ('response', 'answer', 'code', 'solution')
+
+def _first_field(sample: Dict[str, Any], fields) -> str:
+    """Get the first non-empty value among fields as a string, or ''"""
+    for field in fields:
+        value = sample.get(field)
+        if value:
+            return str(value)
+    return ''
+
+def _parse_content(content: str) -> Any:
+    """Parse a content string: JSON with the C parser first, Python literal syntax (single quotes) as the fallback"""
+    try:
+        return orjson.loads(content) if orjson else json.loads(content)
+    except ValueError:
+        return ast.literal_eval(content)
+
 def check_and_convert_dataset_format(sample_data: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Check dataset format and convert to standard LoRA format if needed
@@ -110,10 +204,8 @@ def check_and_convert_dataset_format(sample_data: List[Dict[str, Any]]) -> Dict[
                 content = sample.get('content', '')
                 if isinstance(content, str):
                     # Try to parse as JSON string
-                    import ast
                     try:
-                        # Handle single quotes in JSON-like string
-                        content_dict = ast.literal_eval(content)
+                        content_dict = _parse_content(content)
                         
                         # Extract fields with various possible names
                         instruction = (content_dict.get('Instruction') or 
@@ -168,10 +260,8 @@ def check_and_convert_dataset_format(sample_data: List[Dict[str, Any]]) -> Dict[
     # Check for other possible formats
     if 'question' in sample_keys and 'answer' in sample_keys:
         print("🔄 Converting Q&A format to LoRA format...")
-        converted_samples = []
-        
-        for sample in sample_data:
-            converted_sample = {
+        converted_samples = [
+            {
                 'id': sample.get('id', ''),
                 'instruction': sample.get('question', ''),
                 'output': sample.get('answer', ''),
@@ -180,7 +270,8 @@ def check_and_convert_dataset_format(sample_data: List[Dict[str, Any]]) -> Dict[
                 'source': sample.get('source', ''),
                 'type': sample.get('type', 'Text')
             }
-            converted_samples.append(converted_sample)
+            for sample in sample_data
+        ]
         
         return {
             'format_type': 'qa_format',
@@ -196,21 +287,8 @@ def check_and_convert_dataset_format(sample_data: List[Dict[str, Any]]) -> Dict[
     
     for sample in sample_data:
         # Try to find instruction-like and output-like fields
-        instruction_fields = ['text', 'input', 'prompt', 'question']
-        output_fields = ['response', 'answer', 'code', 'solution']
-        
-        instruction = ''
-        output = ''
-        
-        for field in instruction_fields:
-            if field in sample and sample[field]:
-                instruction = str(sample[field])
-                break
-        
-        for field in output_fields:
-            if field in sample and sample[field]:
-                output = str(sample[field])
-                break
+        instruction = _first_field(sample, UNKNOWN_INSTRUCTION_FIELDS)
+        output = _first_field(sample, UNKNOWN_OUTPUT_FIELDS)
         
         if instruction or output:
             converted_sample = {
@@ -233,60 +311,90 @@ def check_and_convert_dataset_format(sample_data: List[Dict[str, Any]]) -> Dict[
         'available_fields': sample_keys
     }
 
-def load_any_dataset(dataset_id: str, max_samples: int = 1000) -> Dict[str, Any]:
-    """Load any Hugging Face dataset by ID or local file"""
+def load_any_dataset(dataset_id: str, max_samples: int = 1000, probe_only: bool = False) -> Dict[str, Any]:
+    """Load any Hugging Face dataset by ID or local file; probe_only returns just its size and format from one sample"""
     try:
         print(f"Loading dataset: {dataset_id}")
         
         # Check if it's a local file first
-        if dataset_id.endswith('.json'):
+        if dataset_id.endswith(('.json', '.ndjson')):
             return load_local_json_dataset(dataset_id, max_samples)
         
-        # Load the dataset from Hugging Face
-        ds = load_dataset(dataset_id)
-        
-        # Determine which split to use
-        split_name = 'train' if 'train' in ds else list(ds.keys())[0]
-        dataset_split = ds[split_name]
-        
-        # Get sample data
-        sample_data = []
-        total_samples = len(dataset_split)
-        samples_to_load = min(max_samples, total_samples) if max_samples is not None else total_samples
+        if probe_only:
+            # One row is enough to detect the format
+            max_samples = 1
         
-        print(f"Loading {samples_to_load} samples from {total_samples} total...")
+        # Previews stream only the rows they need; full loads (or datasets without a known size) download everything
+        streamed = None
+        if max_samples is not None and max_samples <= STREAMING_MAX_SAMPLES:
+            streamed = _stream_rows(dataset_id, max_samples)
         
-        for i in range(samples_to_load):
-            sample = dataset_split[i]
-            
-            # Try to extract common fields with fallbacks
-            sample_item = {
-                'id': f'{dataset_id.replace("/", "-")}-{i}',
-                'type': 'Code' if 'code' in str(sample).lower() else 'Text',
-                'source': f'Hugging Face - {dataset_id}'
-            }
-            
-            # Extract instruction/input
-            for field in ['instruction', 'input', 'prompt', 'question', 'text']:
-                if field in sample:
-                    sample_item['instruction'] = str(sample[field])
-                    break
+        if streamed is not None:
+            split_name, batch, total_samples, size_bytes = streamed
+            samples_to_load = len(next(iter(batch.values()), []))
+            print(f"Streamed {samples_to_load} samples from {total_samples} total...")
+        else:
+            # Load the dataset from Hugging Face
+            ds = _cached_load(dataset_id)
             
-            # Extract output/target
-            for field in ['output', 'target', 'answer', 'response', 'code', 'solution']:
-                if field in sample:
-                    sample_item['output'] = str(sample[field])
-                    break
+            # Determine which split to use
+            split_name = 'train' if 'train' in ds else list(ds.keys())[0]
+            dataset_split = ds[split_name]
             
-            # Extract system prompt if available
-            if 'system' in sample:
-                sample_item['system'] = str(sample['system'])
+            total_samples = len(dataset_split)
+            # Byte size of the split's Arrow table, known without reading the rows
+            size_bytes = dataset_split.data.nbytes
+            samples_to_load = min(max_samples, total_samples) if max_samples is not None else total_samples
             
-            # If no instruction/output found, use all available fields
-            if 'instruction' not in sample_item:
-                sample_item['content'] = str(sample)
+            print(f"Loading {samples_to_load} samples from {total_samples} total...")
             
-            sample_data.append(sample_item)
+            # One slice converts each Arrow column to Python at once instead of materializing row by row
+            batch = dataset_split[:samples_to_load]
+        columns = list(batch)
+        
+        # Every row has the same columns, so pick the instruction/input and output/target fields once
+        instruction_field = next((field for field in INSTRUCTION_FIELDS if field in batch), None)
+        output_field = next((field for field in OUTPUT_FIELDS if field in batch), None)
+        has_system = 'system' in batch
+        id_prefix = dataset_id.replace("/", "-")
+        source = f'Hugging Face - {dataset_id}'
+        
+        # Whole-row text guesses the type and is the content fallback. It includes the column names, so with
+        # a column named like 'code' every row is Code and the rows only need stringifying for the fallback
+        code_column = any('code' in column.lower() for column in columns)
+        sample_texts = None
+        if instruction_field is None or not code_column:
+            sample_texts = [str(dict(zip(columns, values))) for values in zip(*batch.values())]
+        if code_column:
+            sample_types = ['Code'] * samples_to_load
+        else:
+            sample_types = ['Code' if 'code' in sample_text.lower() else 'Text' for sample_text in sample_texts]
+        sample_data = [
+            {
+                'id': f'{id_prefix}-{i}',
+                'type': sample_type,
+                'source': source
+            }
+            for i, sample_type in enumerate(sample_types)
+        ]
+        
+        # Fill the chosen fields a column at a time
+        if instruction_field is not None:
+            for sample_item, value in zip(sample_data, batch[instruction_field]):
+                sample_item['instruction'] = str(value)
+        if output_field is not None:
+            for sample_item, value in zip(sample_data, batch[output_field]):
+                sample_item['output'] = str(value)
+        
+        # Extract system prompt if available
+        if has_system:
+            for sample_item, value in zip(sample_data, batch['system']):
+                sample_item['system'] = str(value)
+        
+        # If no instruction/output found, use all available fields
+        if instruction_field is None:
+            for sample_item, sample_text in zip(sample_data, sample_texts):
+                sample_item['content'] = sample_text
         
         # 🎯 NEW: Check and convert dataset format
         print("🔍 Checking dataset format compatibility...")
@@ -299,9 +407,23 @@ def load_any_dataset(dataset_id: str, max_samples: int = 1000) -> Dict[str, Any]
         else:
             print(f"ℹ️ No conversion needed: {format_analysis['format_analysis']}")
         
-        # Estimate size
-        avg_sample_size = len(str(sample_data[0])) if sample_data else 0
-        estimated_size = (avg_sample_size * total_samples) / (1024 * 1024)  # MB
+        if probe_only:
+            return {
+                'success': True,
+                'dataset_id': dataset_id,
+                'total_samples': total_samples,
+                'split_used': split_name,
+                'is_lora_compatible': format_analysis['is_lora_compatible'],
+                'format_type': format_analysis['format_type']
+            }
+        
+        # Size from the Arrow data; extrapolate from the first sample only when the metadata has none
+        if size_bytes:
+            size = f'{size_bytes / (1024 * 1024):.1f} MB'
+        else:
+            avg_sample_size = len(str(sample_data[0])) if sample_data else 0
+            estimated_size = (avg_sample_size * total_samples) / (1024 * 1024)  # MB
+            size = f'{estimated_size:.1f} MB (estimated)'
         
         # Prepare metadata with format analysis
         metadata = {
@@ -319,7 +441,7 @@ def load_any_dataset(dataset_id: str, max_samples: int = 1000) -> Dict[str, Any]
             'loaded_samples': len(sample_data),
             'samples': sample_data,
             'format': 'Hugging Face Dataset',
-            'size': f'{estimated_size:.1f} MB (estimated)',
+            'size': size,
             'loaded_at': time.strftime('%Y-%m-%d %H:%M:%S'),
             'metadata': metadata,
             'is_lora_compatible': format_analysis['is_lora_compatible'],
@@ -334,10 +456,99 @@ def load_any_dataset(dataset_id: str, max_samples: int = 1000) -> Dict[str, Any]
             'dataset_id': dataset_id
         }
 
+def _dataset_cache_path(dataset_id: str, max_samples: Optional[int]) -> str:
+    """Get the cache file path for a (dataset_id, max_samples) load"""
+    key = hashlib.sha1(f'{dataset_id}|{max_samples}'.encode()).hexdigest()
+    extension = 'json.zst' if zstandard else 'json.zlib'
+    return os.path.join(CACHE_DIR, f'{key}.{extension}')
+
+def _read_dataset_cache(path: str, dataset_id: str, max_samples: Optional[int]) -> Optional[Dict[str, Any]]:
+    """Read a cached load result, or None if missing, expired or unreadable"""
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL:
+            return None
+        with open(path, 'rb') as f:
+            raw = f.read()
+        raw = zstandard.decompress(raw) if zstandard else zlib.decompress(raw)
+        payload = orjson.loads(raw) if orjson else json.loads(raw)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable dataset cache {path}: {e}")
+        return None
+    
+    if (payload.get('cache_version') != CACHE_VERSION or payload.get('dataset_id') != dataset_id
+            or payload.get('max_samples') != max_samples):
+        return None
+    return payload['result']
+
+def _write_dataset_cache(path: str, dataset_id: str, max_samples: Optional[int], result: Dict[str, Any]):
+    """Write a load result to the cache atomically"""
+    payload = {
+        'cache_version': CACHE_VERSION,
+        'cached_at': time.time(),
+        'dataset_id': dataset_id,
+        'max_samples': max_samples,
+        'result': result
+    }
+    raw = orjson.dumps(payload) if orjson else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    raw = zstandard.compress(raw) if zstandard else zlib.compress(raw, 6)
+    
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not write dataset cache {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_any_dataset_cached(dataset_id: str, max_samples: int = 1000) -> Dict[str, Any]:
+    """Load a dataset through the on-disk cache (local files and failures are never cached)"""
+    if dataset_id.endswith(('.json', '.ndjson')):
+        return load_any_dataset(dataset_id, max_samples)
+    
+    path = _dataset_cache_path(dataset_id, max_samples)
+    cached = _read_dataset_cache(path, dataset_id, max_samples)
+    if cached is not None:
+        print(f"⚡ Loaded {dataset_id} from cache")
+        return cached
+    
+    result = load_any_dataset(dataset_id, max_samples)
+    if result.get('success'):
+        _write_dataset_cache(path, dataset_id, max_samples, result)
+    return result
+
+NDJSON_SIDECAR_MIN_SAMPLES = 10_000
+
+def save_dataset_ndjson(sample_iter, path: str) -> int:
+    """Write samples one JSON object per line so readers can stream them; returns the row count"""
+    count = 0
+    with open(path, 'wb') as f:
+        for row in sample_iter:
+            if orjson:
+                f.write(orjson.dumps(row, option=orjson.OPT_NON_STR_KEYS) + b'\n')
+            else:
+                f.write(json.dumps(row, ensure_ascii=False).encode('utf-8') + b'\n')
+            count += 1
+    return count
+
 def save_dataset_json(dataset_info: Dict[str, Any], filename: str):
-    """Save dataset info to JSON file"""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(dataset_info, f, indent=2, ensure_ascii=False)
+    """Save dataset info to JSON file, plus a <filename>.ndjson sidecar of the samples for large datasets"""
+    samples = dataset_info.get('samples')
+    if isinstance(samples, list) and len(samples) > NDJSON_SIDECAR_MIN_SAMPLES:
+        sidecar = os.path.splitext(filename)[0] + '.ndjson'
+        save_dataset_ndjson(samples, sidecar)
+        print(f"Samples streamed to {sidecar}")
+    if orjson:
+        # Same indented UTF-8 layout as json.dump below, serialized in C
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(dataset_info, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(dataset_info, f, indent=2, ensure_ascii=False)
     print(f"Dataset saved to {filename}")
 
 def main():
@@ -373,20 +584,76 @@ def main():
     for dataset in datasets:
         print(f"  - {dataset['name']}: {dataset['size']}")
 
+def _read_json_file(path: str) -> Any:
+    """Parse a JSON file from its bytes: orjson straight from a memory map, or json from a single pread"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if hasattr(os, 'posix_fadvise') and size:
+            os.posix_fadvise(fd, 0, size, os.POSIX_FADV_SEQUENTIAL)
+        if orjson and size:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    return orjson.loads(view)
+                finally:
+                    view.release()
+        return json.loads(os.pread(fd, size, 0))
+    finally:
+        os.close(fd)
+
+def _read_ndjson_file(path: str, max_samples: Optional[int]) -> Tuple[List[Any], int]:
+    """Parse the first max_samples lines of an NDJSON file and count the rest without parsing them"""
+    loads = orjson.loads if orjson else json.loads
+    samples = []
+    total = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if max_samples is not None and len(samples) >= max_samples:
+                total += 1
+                break
+            if line.strip():
+                samples.append(loads(line))
+        total += len(samples)
+        # Remaining rows only need their newlines counted
+        chunk = b''
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            total += chunk.count(b'\n')
+        if chunk and not chunk.endswith(b'\n'):
+            total += 1
+    return samples, total
+
 def load_local_json_dataset(file_path: str, max_samples: int = 1000) -> Dict[str, Any]:
-    """Load a local JSON dataset file"""
+    """Load a local JSON or NDJSON dataset file"""
     try:
-        import os
         full_path = os.path.join('dataset', file_path)
         
-        if not os.path.exists(full_path):
+        # Opening is the existence check, saving a separate stat per file
+        try:
+            if file_path.endswith('.ndjson'):
+                # One sample per line: only max_samples rows are parsed
+                limited_samples, total = _read_ndjson_file(full_path, max_samples)
+            else:
+                data = _read_json_file(full_path)
+        except FileNotFoundError:
             return {
                 'success': False,
                 'error': f'Local file {file_path} not found'
             }
         
-        with open(full_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if file_path.endswith('.ndjson'):
+            return {
+                'success': True,
+                'name': 'Local Dataset',
+                'description': 'Local dataset from NDJSON file',
+                'dataset_id': file_path,
+                'total_samples': total,
+                'loaded_samples': len(limited_samples),
+                'samples': limited_samples,
+                'format': 'JSONL',
+                'size': f'{total:,} samples',
+                'loaded_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
         
         # Handle different JSON structures
         if isinstance(data, dict) and 'datasets' in data:
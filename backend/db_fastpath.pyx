@@ -0,0 +1,30 @@
+# cython: language_level=3
+"""
+Cython build of database._rows_to_dicts for the list endpoints
+Optional - build in place with: cd backend && cythonize -i db_fastpath.pyx
+"""
+
+from cpython.dict cimport PyDict_New, PyDict_SetItem
+
+
+def rows_to_dicts(list rows, tuple names, tuple json_columns, loads):
+    """Turn tuple rows into dicts, parsing the JSON columns given as (index, empty type) pairs"""
+    cdef Py_ssize_t i, j, index
+    cdef Py_ssize_t n_rows = len(rows), n_cols = len(names), n_json = len(json_columns)
+    cdef list result = [None] * n_rows
+    cdef tuple row, spec
+    cdef dict item
+    cdef object value
+
+    for i in range(n_rows):
+        row = <tuple>rows[i]
+        item = PyDict_New()
+        for j in range(n_cols):
+            PyDict_SetItem(item, names[j], row[j])
+        for j in range(n_json):
+            spec = <tuple>json_columns[j]
+            index = spec[0]
+            value = row[index]
+            PyDict_SetItem(item, names[index], loads(value) if value else spec[1]())
+        result[i] = item
+    return result
@@ -9,13 +9,24 @@ import json
 import time
 import subprocess
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, List, Tuple
 from database import db
 
+OLLAMA_GENERATE_URL = 'http://localhost:11434/api/generate'
+EVAL_QUERY_WORKERS = 8  # Concurrent Ollama requests per executor
+OLLAMA_KEEP_ALIVE = '30m'  # Keep the model loaded between evaluation queries
+
+# Keep-alive connections shared by the query threads
+_ollama_session = requests.Session()
+_ollama_session.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 class EvaluationExecutor:
     def __init__(self):
         self.running_evaluations = {}
+        self._query_pool = ThreadPoolExecutor(max_workers=EVAL_QUERY_WORKERS, thread_name_prefix='eval-query')
     
     def start_evaluation(self, eval_id: int, eval_data: Dict[str, Any]) -> bool:
         """Start real evaluation for a model against a dataset"""
@@ -114,11 +125,7 @@ class EvaluationExecutor:
     
     def _get_dataset(self, dataset_id: int) -> Dict[str, Any]:
         """Get dataset by ID"""
-        all_datasets = db.get_all_datasets()
-        for dataset in all_datasets:
-            if dataset['id'] == dataset_id:
-                return dataset
-        return None
+        return db.get_dataset_summary(dataset_id)
     
     def _get_dataset_samples(self, dataset: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract samples from dataset for evaluation"""
@@ -127,7 +134,12 @@ class EvaluationExecutor:
         samples = metadata.get('all_samples', metadata.get('samples_preview', []))
         
         # Limit to first 3 samples for evaluation (to avoid timeout with large models)
-        return samples[:3]
+        # Expected key terms are computed once here rather than on every response check
+        return [{**sample, '_expected_terms': self._expected_terms(sample)} for sample in samples[:3]]
+    
+    def _expected_terms(self, sample: Dict[str, Any]) -> frozenset:
+        """Key terms (longer than 2 characters) of a sample's expected output"""
+        return frozenset(term for term in sample.get('output', '').lower().split() if len(term) > 2)
     
     def _evaluate_accuracy_with_baseline(self, model_name: str, samples: List[Dict[str, Any]], eval_data: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate model accuracy with before/after comparison"""
@@ -167,16 +179,12 @@ class EvaluationExecutor:
         correct_predictions = 0
         total_inference_time = 0
         predictions = []
+        completed = 0
         
-        for i, sample in enumerate(samples):
+        for i, sample, test_prompt, future in self._query_samples(model_name, samples):
+            completed += 1
             try:
-                # Prepare test prompt
-                test_prompt = self._prepare_test_prompt(sample)
-                
-                # Test model
-                start_time = time.time()
-                response = self._query_model(model_name, test_prompt)
-                inference_time = time.time() - start_time
+                response, inference_time = future.result()
                 
                 total_inference_time += inference_time
                 
@@ -195,14 +203,16 @@ class EvaluationExecutor:
                 })
                 
                 # Progress update every 10 samples
-                if (i + 1) % 10 == 0:
-                    progress = (i + 1) / total_samples
-                    print(f"📊 Progress: {progress*100:.1f}% ({i+1}/{total_samples})")
+                if completed % 10 == 0:
+                    progress = completed / total_samples
+                    print(f"📊 Progress: {progress*100:.1f}% ({completed}/{total_samples})")
                 
             except Exception as e:
                 print(f"⚠️ Error testing sample {i}: {e}")
                 continue
         
+        predictions.sort(key=lambda p: p['sample_id'])
+        
         # Calculate metrics
         accuracy = (correct_predictions / total_samples) * 100 if total_samples > 0 else 0
         avg_inference_time = total_inference_time / total_samples if total_samples > 0 else 0
@@ -243,16 +253,31 @@ class EvaluationExecutor:
         else:
             return f"### Instruction:\n{instruction}\n\n### Response:"
     
+    def _query_samples(self, model_name: str, samples: List[Dict[str, Any]]):
+        """Query the model for all samples concurrently, yielding (index, sample, prompt, future) as each finishes"""
+        prompts = [self._prepare_test_prompt(sample) for sample in samples]
+        futures = {self._query_pool.submit(self._timed_query, model_name, prompt): i for i, prompt in enumerate(prompts)}
+        for future in as_completed(futures):
+            i = futures[future]
+            yield i, samples[i], prompts[i], future
+    
+    def _timed_query(self, model_name: str, prompt: str) -> Tuple[str, float]:
+        """Query the model and return its response with the inference time in seconds"""
+        start_time = time.time()
+        response = self._query_model(model_name, prompt)
+        return response, time.time() - start_time
+    
     def _query_model(self, model_name: str, prompt: str) -> str:
         """Query model via Ollama API"""
         try:
             # Use Ollama API to query the model
-            response = requests.post(
-                'http://localhost:11434/api/generate',
+            response = _ollama_session.post(
+                OLLAMA_GENERATE_URL,
                 json={
                     'model': model_name,
                     'prompt': prompt,
-                    'stream': False
+                    'stream': False,
+                    'keep_alive': OLLAMA_KEEP_ALIVE
                 },
                 timeout=60
             )
@@ -268,21 +293,17 @@ class EvaluationExecutor:
     
     def _evaluate_response(self, sample: Dict[str, Any], response: str) -> bool:
         """Evaluate if response is correct (simple keyword matching)"""
-        expected = sample.get('output', '').lower()
-        actual = response.lower()
+        expected_terms = sample.get('_expected_terms')
+        if expected_terms is None:
+            expected_terms = self._expected_terms(sample)
         
         # Simple evaluation: check if key terms from expected output are in actual response
-        if not expected:
+        if not expected_terms:
             return False
         
-        # Split expected into key terms
-        expected_terms = [term.strip() for term in expected.split() if len(term.strip()) > 2]
-        
         # Check if at least 50% of key terms are present in response
-        matches = sum(1 for term in expected_terms if term in actual)
-        match_ratio = matches / len(expected_terms) if expected_terms else 0
-        
-        return match_ratio >= 0.5
+        matches = len(expected_terms.intersection(response.lower().split()))
+        return matches / len(expected_terms) >= 0.5
     
     def _evaluate_code_generation(self, model_name: str, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Evaluate model for code generation tasks"""
@@ -326,15 +347,9 @@ class EvaluationExecutor:
         total_inference_time = 0
         predictions = []
         
-        for i, sample in enumerate(samples):
+        for i, sample, test_prompt, future in self._query_samples(model_name, samples):
             try:
-                # Prepare test prompt
-                test_prompt = self._prepare_test_prompt(sample)
-                
-                # Test model
-                start_time = time.time()
-                response = self._query_model(model_name, test_prompt)
-                inference_time = time.time() - start_time
+                response, inference_time = future.result()
                 
                 total_inference_time += inference_time
                 
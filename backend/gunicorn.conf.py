@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for AI Refinement Dashboard backend
+Usage: cd backend && gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Threaded workers so blocking SQLite, Ollama and ChromaDB calls don't serialize requests
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Running training jobs and Socket.IO sessions live in worker memory, so one worker is the safe default.
+# More workers need sticky sessions in front of gunicorn and SOCKETIO_MESSAGE_QUEUE (e.g. redis://localhost:6379/0)
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+
+# Model listing and dataset loading can take a while
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 300))
+
+# Import the app in each worker after fork so the SQLite, ChromaDB and thread pool state is per-process
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+
+def post_worker_init(worker):
+    """Warm each worker's caches in the background once the app is loaded"""
+    from api_server import start_warm_up
+    start_warm_up()
+
+def worker_exit(server, worker):
+    """Close the worker's SQLite connections on shutdown"""
+    from database import close_db
+    close_db()
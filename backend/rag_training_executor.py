@@ -15,11 +15,20 @@ from typing import Dict, Any, Optional
 from database import db
 from chromadb_service import chromadb_service
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class TrainingExecutor:
     def __init__(self):
         self.running_jobs = {}
 
+    def is_running(self, job_id: int) -> bool:
+        """Check whether this executor has a live training thread for the job"""
+        return job_id in self.running_jobs
+
     def start_training(self, job_id: int, job_data: Dict[str, Any]) -> bool:
         """Start real training for a job"""
         try:
@@ -34,13 +43,14 @@ class TrainingExecutor:
                 args=(job_id, job_data)
             )
             training_thread.daemon = True
-            training_thread.start()
 
+            # Register before starting so a fast-failing thread can't finish before the entry exists
             self.running_jobs[job_id] = {
                 'thread': training_thread,
                 'status': 'RUNNING',
                 'started_at': datetime.now()
             }
+            training_thread.start()
 
             return True
         except Exception as e:
@@ -73,6 +83,10 @@ class TrainingExecutor:
                 'error_message': str(e),
                 'completed_at': datetime.now().isoformat()
             })
+        finally:
+            # Clean up running jobs dictionary
+            if job_id in self.running_jobs:
+                del self.running_jobs[job_id]
 
     # ---------------------- RAG Training ----------------------
     def _execute_rag_training(self, job_id: int, job_data: Dict[str, Any]):
@@ -86,17 +100,17 @@ class TrainingExecutor:
                 config = json.loads(config)
 
             print(f"🔍 Starting RAG training for: {job_name}")
-            db.update_training_job(job_id, {'progress': 0.1})
+            db.update_job_progress(job_id, 0.1)
 
             self._create_modelfile(job_name, base_model, config)
-            db.update_training_job(job_id, {'progress': 0.3})
+            db.update_job_progress(job_id, 0.3)
 
             if config.get('selectedDatasets'):
                 self._ingest_knowledge_base(job_id, config)
-            db.update_training_job(job_id, {'progress': 0.6})
+            db.update_job_progress(job_id, 0.6)
 
             actual_model_name = self._create_ollama_model(job_name)
-            db.update_training_job(job_id, {'progress': 0.9})
+            db.update_job_progress(job_id, 0.9)
 
             db.update_training_job(job_id, {
                 'status': 'COMPLETED',
@@ -166,8 +180,7 @@ PARAMETER repeat_last_n 64
 
             for dataset_id in dataset_ids:
                 dataset_id_int = int(dataset_id)
-                all_datasets = db.get_all_datasets()
-                dataset = next((d for d in all_datasets if d['id'] == dataset_id_int), None)
+                dataset = db.get_dataset_summary(dataset_id_int)
 
                 if dataset:
                     print(f"🔄 Processing dataset: {dataset['name']}")
@@ -323,16 +336,16 @@ PARAMETER repeat_last_n 64
                 config = json.loads(config)
 
             print(f"🧠 Starting LoRA training for: {job_name}")
-            db.update_training_job(job_id, {'progress': 0.1})
+            db.update_job_progress(job_id, 0.1)
 
             self._prepare_lora_data(job_id, config)
-            db.update_training_job(job_id, {'progress': 0.2})
+            db.update_job_progress(job_id, 0.2)
 
             self._run_lora_training(job_id, job_name, base_model, config)
-            db.update_training_job(job_id, {'progress': 0.8})
+            db.update_job_progress(job_id, 0.8)
 
             self._create_ollama_model_from_lora(job_name, base_model)
-            db.update_training_job(job_id, {'progress': 0.95})
+            db.update_job_progress(job_id, 0.95)
 
             db.update_training_job(job_id, {
                 'status': 'COMPLETED',
@@ -360,8 +373,7 @@ PARAMETER repeat_last_n 64
 
             for dataset_id in dataset_ids:
                 dataset_id_int = int(dataset_id)
-                all_datasets = db.get_all_datasets()
-                dataset = next((d for d in all_datasets if d['id'] == dataset_id_int), None)
+                dataset = db.get_dataset_summary(dataset_id_int)
 
                 if dataset:
                     samples = self._convert_dataset_to_lora_format(dataset)
@@ -411,6 +423,10 @@ PARAMETER repeat_last_n 64
         return samples
 
     def _save_jsonl(self, data: list, filepath: str):
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.writelines(orjson.dumps(item) + b'\n' for item in data)
+            return
         with open(filepath, 'w') as f:
             for item in data:
                 f.write(json.dumps(item) + '\n')
@@ -10,16 +10,25 @@ import threading
 import subprocess
 import re
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from database import db
 from chromadb_service import chromadb_service
 from lora_script_generator import LoRAScriptGenerator
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class TrainingExecutor:
     def __init__(self):
         self.running_jobs = {}
 
+    def is_running(self, job_id: int) -> bool:
+        """Check whether this executor has a live training thread for the job"""
+        return job_id in self.running_jobs
+
     def start_training(self, job_id: int, job_data: Dict[str, Any]) -> bool:
         """Start real training for a job"""
         try:
@@ -34,13 +43,14 @@ class TrainingExecutor:
                 args=(job_id, job_data)
             )
             training_thread.daemon = True
-            training_thread.start()
 
+            # Register before starting so a fast-failing thread can't finish before the entry exists
             self.running_jobs[job_id] = {
                 'thread': training_thread,
                 'status': 'RUNNING',
                 'started_at': datetime.now()
             }
+            training_thread.start()
 
             return True
 
@@ -81,16 +91,16 @@ class TrainingExecutor:
             config_str = job_data.get('config', '{}')
             config = json.loads(config_str) if isinstance(config_str, str) else config_str
 
-            db.update_training_job(job_id, {'progress': 0.1})
+            db.update_job_progress(job_id, 0.1)
             self._create_modelfile(job_name, job_data.get('base_model'), config)
-            db.update_training_job(job_id, {'progress': 0.3})
+            db.update_job_progress(job_id, 0.3)
 
             if config.get('selectedDatasets'):
                 self._ingest_knowledge_base(job_id, config)
-            db.update_training_job(job_id, {'progress': 0.6})
+            db.update_job_progress(job_id, 0.6)
 
             actual_model_name = self._create_ollama_model(job_name)
-            db.update_training_job(job_id, {'progress': 0.9})
+            db.update_job_progress(job_id, 0.9)
 
             db.update_training_job(job_id, {
                 'status': 'COMPLETED',
@@ -116,15 +126,15 @@ class TrainingExecutor:
             config_str = job_data.get('config', '{}')
             config = json.loads(config_str) if isinstance(config_str, str) else config_str
 
-            db.update_training_job(job_id, {'progress': 0.1})
+            db.update_job_progress(job_id, 0.1)
             self._prepare_lora_data(job_id, config)
-            db.update_training_job(job_id, {'progress': 0.2})
+            db.update_job_progress(job_id, 0.2)
 
             self._run_lora_training(job_id, job_name, base_model, config)
-            db.update_training_job(job_id, {'progress': 0.8})
+            db.update_job_progress(job_id, 0.8)
 
             actual_model_name = self._create_ollama_model_from_lora(job_name, base_model)
-            db.update_training_job(job_id, {'progress': 0.95})
+            db.update_job_progress(job_id, 0.95)
 
             db.update_training_job(job_id, {
                 'status': 'COMPLETED',
@@ -164,7 +174,7 @@ PARAMETER top_p 0.9
             return
         all_samples = []
         for dataset_id in dataset_ids:
-            dataset = next((ds for ds in db.get_all_datasets() if ds['id'] == int(dataset_id)), None)
+            dataset = db.get_dataset_summary(int(dataset_id))
             if dataset:
                 samples = self._extract_dataset_samples_for_chromadb(dataset)
                 all_samples.extend(samples)
@@ -218,7 +228,7 @@ PARAMETER top_p 0.9
         train_samples, val_samples = [], []
         valid_datasets = []
         for dataset_id in dataset_ids:
-            dataset = next((ds for ds in db.get_all_datasets() if ds['id'] == int(dataset_id)), None)
+            dataset = db.get_dataset_summary(int(dataset_id))
             if dataset:
                 samples = self._convert_dataset_to_lora_format(dataset)
                 if samples:
@@ -278,6 +288,10 @@ PARAMETER top_p 0.9
         return samples
 
     def _save_jsonl(self, data: list, filepath: str):
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.writelines(orjson.dumps(item) + b'\n' for item in data)
+            return
         with open(filepath, 'w') as f:
             for item in data:
                 f.write(json.dumps(item) + '\n')
@@ -409,3 +423,26 @@ PARAMETER temperature 0.7
                     'running': False
                 }
             return None
+
+    def get_training_statuses(self, job_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        statuses = {}
+        stored_ids = []
+        for job_id in job_ids:
+            job_info = self.running_jobs.get(job_id)
+            if job_info:
+                statuses[job_id] = {
+                    'status': job_info['status'],
+                    'started_at': job_info['started_at'].isoformat(),
+                    'running': True
+                }
+            else:
+                stored_ids.append(job_id)
+        
+        # Jobs that aren't running are resolved with a single database query
+        for job_id, record in db.get_training_job_statuses(stored_ids).items():
+            statuses[job_id] = {
+                'status': record['status'],
+                'progress': record['progress'],
+                'running': False
+            }
+        return statuses
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for AI Refinement Dashboard
+Run with: gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+from api_server import app
+
+application = app
@@ -49,6 +49,7 @@ stop_services() {
     pkill -f "npm run dev" 2>/dev/null
     pkill -f "vite" 2>/dev/null
     pkill -f "python3.*api_server" 2>/dev/null
+    pkill -f "gunicorn.*wsgi:application" 2>/dev/null
     
     sleep 2
     print_success "All services stopped"
@@ -105,8 +106,12 @@ start_backend() {
         return 1
     fi
     
-    # Start backend in background
-    nohup python3 api_server.py > api_server.log 2>&1 &
+    # Start backend in background (gunicorn when available, dev server otherwise)
+    if command -v gunicorn >/dev/null 2>&1; then
+        nohup gunicorn -c gunicorn.conf.py wsgi:application > api_server.log 2>&1 &
+    else
+        nohup python3 api_server.py > api_server.log 2>&1 &
+    fi
     BACKEND_PID=$!
     echo $BACKEND_PID > backend.pid
     